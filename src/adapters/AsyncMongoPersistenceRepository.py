@@ -0,0 +1,85 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Any, Optional
+
+from multilingual_paragraph_extractor.domain.ParagraphsFromLanguage import ParagraphsFromLanguage
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.LabeledData import LabeledData
+from trainable_entity_extractor.domain.PredictionData import PredictionData
+from trainable_entity_extractor.domain.Suggestion import Suggestion
+
+from adapters.MongoPersistenceRepository import MongoPersistenceRepository
+from config import MONGO_MAX_WORKERS
+from domain.ParagraphExtractionData import ParagraphExtractionData
+from ports.AsyncPersistenceRepository import AsyncPersistenceRepository
+
+
+class AsyncMongoPersistenceRepository(AsyncPersistenceRepository):
+
+    def __init__(self, persistence_repository: MongoPersistenceRepository = None, max_workers: int = MONGO_MAX_WORKERS):
+        self.persistence_repository = persistence_repository or MongoPersistenceRepository()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mongo")
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.persistence_repository.close()
+
+    async def run(self, method: Callable, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(method, *args, **kwargs))
+
+    async def get_indexes_usage(self) -> dict[str, list[dict[str, Any]]]:
+        return await self.run(self.persistence_repository.get_indexes_usage)
+
+    async def save_prediction_data(self, extraction_identifier: ExtractionIdentifier, prediction_data: PredictionData):
+        await self.run(self.persistence_repository.save_prediction_data, extraction_identifier, prediction_data)
+
+    async def save_prediction_data_list(
+        self, extraction_identifier: ExtractionIdentifier, prediction_data_list: list[PredictionData]
+    ):
+        await self.run(self.persistence_repository.save_prediction_data_list, extraction_identifier, prediction_data_list)
+
+    async def load_and_delete_prediction_data(self, extraction_identifier: ExtractionIdentifier) -> list[PredictionData]:
+        return await self.run(self.persistence_repository.load_and_delete_prediction_data, extraction_identifier)
+
+    async def load_and_delete_prediction_data_page(
+        self, extraction_identifier: ExtractionIdentifier, limit: int
+    ) -> list[PredictionData]:
+        return await self.run(self.persistence_repository.load_and_delete_prediction_data_page, extraction_identifier, limit)
+
+    async def save_labeled_data(self, extraction_identifier: ExtractionIdentifier, labeled_data: LabeledData):
+        await self.run(self.persistence_repository.save_labeled_data, extraction_identifier, labeled_data)
+
+    async def save_labeled_data_list(
+        self, extraction_identifier: ExtractionIdentifier, labeled_data_list: list[LabeledData]
+    ):
+        await self.run(self.persistence_repository.save_labeled_data_list, extraction_identifier, labeled_data_list)
+
+    async def load_and_delete_labeled_data(self, extraction_identifier: ExtractionIdentifier) -> list[LabeledData]:
+        return await self.run(self.persistence_repository.load_and_delete_labeled_data, extraction_identifier)
+
+    async def save_suggestions(self, extraction_identifier: ExtractionIdentifier, suggestions: list[Suggestion]):
+        await self.run(self.persistence_repository.save_suggestions, extraction_identifier, suggestions)
+
+    async def load_suggestions(self, extraction_identifier: ExtractionIdentifier) -> list[Suggestion]:
+        return await self.run(self.persistence_repository.load_suggestions, extraction_identifier)
+
+    async def load_suggestions_page(
+        self, extraction_identifier: ExtractionIdentifier, after_id: Optional[str], page_size: int
+    ) -> tuple[Optional[str], list[Suggestion]]:
+        return await self.run(self.persistence_repository.load_suggestions_page, extraction_identifier, after_id, page_size)
+
+    async def delete_suggestions_up_to(self, extraction_identifier: ExtractionIdentifier, after_id: str):
+        await self.run(self.persistence_repository.delete_suggestions_up_to, extraction_identifier, after_id)
+
+    async def save_paragraph_extraction_data(
+        self, extraction_identifier: ExtractionIdentifier, paragraph_extraction_data: ParagraphExtractionData
+    ):
+        await self.run(
+            self.persistence_repository.save_paragraph_extraction_data, extraction_identifier, paragraph_extraction_data
+        )
+
+    async def load_paragraphs_from_languages(
+        self, extraction_identifier: ExtractionIdentifier
+    ) -> list[ParagraphsFromLanguage]:
+        return await self.run(self.persistence_repository.load_paragraphs_from_languages, extraction_identifier)
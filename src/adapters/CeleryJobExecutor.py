@@ -10,9 +10,11 @@ from trainable_entity_extractor.ports.JobExecutor import JobExecutor
 from trainable_entity_extractor.ports.Logger import Logger
 
 from adapters.CloudModelStorage import CloudModelStorage
+from adapters.XmlHashSidecar import XmlHashSidecar
 from config import NAME, REDIS_HOST, REDIS_PORT, NO_GPU
 from drivers.distributed_worker.distributed_gpu import train_gpu, performance_gpu, predict_gpu
 from drivers.distributed_worker.distributed_no_gpu import train_no_gpu, performance_no_gpu, predict_no_gpu
+from drivers.samples_codecs import SAMPLES_CODECS
 from use_cases.SampleProcessorUseCase import SampleProcessorUseCase
 
 
@@ -144,4 +146,4 @@ class CeleryJobExecutor(JobExecutor):
                     )
 
     def is_extractor_cancelled(self, extractor_identifier: ExtractionIdentifier) -> bool:
-        return SampleProcessorUseCase(extractor_identifier).is_extractor_cancelled()
+        return SampleProcessorUseCase(extractor_identifier, SAMPLES_CODECS, XmlHashSidecar()).is_extractor_cancelled()
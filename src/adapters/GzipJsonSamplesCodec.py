@@ -0,0 +1,16 @@
+import gzip
+import json
+
+from ports.SamplesCodec import SamplesCodec
+
+
+class GzipJsonSamplesCodec(SamplesCodec):
+    name = "gzip-json"
+    media_type = "application/json"
+    content_encoding = "gzip"
+
+    def encode(self, samples: list[dict]) -> bytes:
+        return gzip.compress(json.dumps(samples).encode("utf-8"), compresslevel=6)
+
+    def decode(self, content: bytes) -> list[dict]:
+        return json.loads(gzip.decompress(content).decode("utf-8"))
@@ -0,0 +1,17 @@
+import gzip
+
+import msgpack
+
+from ports.SamplesCodec import SamplesCodec
+
+
+class GzipMsgpackSamplesCodec(SamplesCodec):
+    name = "gzip-msgpack"
+    media_type = "application/x-msgpack"
+    content_encoding = "gzip"
+
+    def encode(self, samples: list[dict]) -> bytes:
+        return gzip.compress(msgpack.packb(samples, use_bin_type=True), compresslevel=6)
+
+    def decode(self, content: bytes) -> list[dict]:
+        return msgpack.unpackb(gzip.decompress(content), raw=False)
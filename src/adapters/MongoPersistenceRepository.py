@@ -1,6 +1,10 @@
-from typing import Optional
+import uuid
+from datetime import datetime, timezone, timedelta
+from itertools import islice
+from typing import Optional, Any
 
 import pymongo
+from bson import ObjectId
 from multilingual_paragraph_extractor.domain.ParagraphsFromLanguage import ParagraphsFromLanguage
 from pydantic import BaseModel
 from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
@@ -8,20 +12,93 @@ from trainable_entity_extractor.domain.LabeledData import LabeledData
 from trainable_entity_extractor.domain.PredictionData import PredictionData
 from trainable_entity_extractor.domain.Suggestion import Suggestion
 
-from config import MONGO_HOST, MONGO_PORT
+from adapters.SegmentBoxesColumnarCodec import SegmentBoxesColumnarCodec
+from config import (
+    MONGO_HOST,
+    MONGO_PORT,
+    MONGO_WRITE_BATCH_SIZE,
+    MONGO_TRANSIENT_DATA_TTL,
+    MONGO_CLAIM_BATCH_SIZE,
+    MONGO_CLAIM_TIMEOUT,
+    SEGMENT_BOXES_COLUMNAR_THRESHOLD,
+    SEGMENT_BOXES_COMPRESSION,
+)
 from domain.ParagraphExtractionData import ParagraphExtractionData
 from ports.PersistenceRepository import PersistenceRepository
 
 
+EXTRACTION_INDEX_NAME = "run_name_extraction_name"
+CREATED_AT_INDEX_NAME = "created_at_ttl"
+TRANSIENT_COLLECTIONS = ["labeled_data", "prediction_data", "suggestions", "paragraphs_from_languages"]
+COLLECTIONS = TRANSIENT_COLLECTIONS + ["paragraph_extraction_data"]
+SEGMENT_BOXES_FIELDS = ["xml_segments_boxes", "label_segments_boxes"]
+
+
 class MongoPersistenceRepository(PersistenceRepository):
 
-    def __init__(self):
+    def __init__(
+        self,
+        write_batch_size: int = MONGO_WRITE_BATCH_SIZE,
+        claim_batch_size: int = MONGO_CLAIM_BATCH_SIZE,
+        columnar_threshold: int = SEGMENT_BOXES_COLUMNAR_THRESHOLD,
+        segment_boxes_codec: SegmentBoxesColumnarCodec = None,
+    ):
         self.mongodb_client = pymongo.MongoClient(f"{MONGO_HOST}:{MONGO_PORT}")
         self.mongo_db = self.mongodb_client["pdf_metadata_extraction"]
+        self.write_batch_size = write_batch_size
+        self.claim_batch_size = claim_batch_size
+        self.columnar_threshold = columnar_threshold
+        self.segment_boxes_codec = segment_boxes_codec or SegmentBoxesColumnarCodec(compress=SEGMENT_BOXES_COMPRESSION)
 
     def close(self):
         self.mongodb_client.close()
 
+    def create_indexes(self, transient_data_ttl: int = MONGO_TRANSIENT_DATA_TTL):
+        for collection_name in COLLECTIONS:
+            self.mongo_db[collection_name].create_index(
+                [("run_name", pymongo.ASCENDING), ("extraction_name", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)],
+                name=EXTRACTION_INDEX_NAME,
+            )
+
+        for collection_name in TRANSIENT_COLLECTIONS:
+            self.create_ttl_index(collection_name, transient_data_ttl)
+
+    def create_ttl_index(self, collection_name: str, ttl: int):
+        collection = self.mongo_db[collection_name]
+        ttl_index = collection.index_information().get(CREATED_AT_INDEX_NAME)
+        if ttl <= 0:
+            if ttl_index:
+                collection.drop_index(CREATED_AT_INDEX_NAME)
+            return
+
+        if not ttl_index:
+            collection.create_index("created_at", name=CREATED_AT_INDEX_NAME, expireAfterSeconds=ttl)
+        elif ttl_index.get("expireAfterSeconds") != ttl:
+            self.mongo_db.command(
+                {"collMod": collection_name, "index": {"name": CREATED_AT_INDEX_NAME, "expireAfterSeconds": ttl}}
+            )
+
+    def get_indexes_usage(self) -> dict[str, list[dict[str, Any]]]:
+        indexes_usage = dict()
+        for collection_name in COLLECTIONS:
+            indexes_keys = {
+                name: dict(index["key"]) for name, index in self.mongo_db[collection_name].index_information().items()
+            }
+            indexes_accesses = {
+                index_stats["name"]: index_stats["accesses"]
+                for index_stats in self.mongo_db[collection_name].aggregate([{"$indexStats": {}}])
+            }
+            indexes_usage[collection_name] = [
+                {
+                    "name": name,
+                    "key": key,
+                    "operations": indexes_accesses.get(name, {}).get("ops", 0),
+                    "since": indexes_accesses.get(name, {}).get("since"),
+                }
+                for name, key in indexes_keys.items()
+            ]
+        return indexes_usage
+
     @staticmethod
     def get_filter(extraction_identifier: ExtractionIdentifier):
         return {
@@ -33,53 +110,138 @@ class MongoPersistenceRepository(PersistenceRepository):
     def inject_extractor_identifier(extraction_identifier: ExtractionIdentifier, data: dict):
         data["run_name"] = extraction_identifier.run_name
         data["extraction_name"] = extraction_identifier.extraction_name
+        data["created_at"] = datetime.now(timezone.utc)
         return data
 
-    def save_data(self, extraction_identifier: ExtractionIdentifier, data: BaseModel, collection_name: str):
+    def dump_data(self, data: BaseModel) -> dict:
         data_dict = data.model_dump()
+        for field in SEGMENT_BOXES_FIELDS:
+            segment_boxes = data_dict.get(field)
+            if self.columnar_threshold and isinstance(segment_boxes, list) and len(segment_boxes) >= self.columnar_threshold:
+                data_dict[field] = self.segment_boxes_codec.encode(segment_boxes) or segment_boxes
+        return data_dict
+
+    def expand_segment_boxes(self, document: dict) -> dict:
+        for field in SEGMENT_BOXES_FIELDS:
+            if self.segment_boxes_codec.is_encoded(document.get(field)):
+                document[field] = self.segment_boxes_codec.decode(document[field])
+        return document
+
+    def save_data(self, extraction_identifier: ExtractionIdentifier, data: BaseModel, collection_name: str):
+        data_dict = self.dump_data(data)
         data_dict = self.inject_extractor_identifier(extraction_identifier, data_dict)
         self.mongo_db[collection_name].insert_one(data_dict)
 
+    def save_data_list(self, extraction_identifier: ExtractionIdentifier, data_list: list[BaseModel], collection_name: str):
+        data_iterator = iter(data_list)
+        while batch := list(islice(data_iterator, self.write_batch_size)):
+            data_dicts = [self.inject_extractor_identifier(extraction_identifier, self.dump_data(data)) for data in batch]
+            self.mongo_db[collection_name].insert_many(data_dicts, ordered=False)
+
+    def claim_batch(
+        self, extraction_identifier: ExtractionIdentifier, collection_name: str, claim_token: str, batch_size: int
+    ) -> Optional[list[dict]]:
+        collection = self.mongo_db[collection_name]
+        now = datetime.now(timezone.utc)
+        claimable = {
+            **self.get_filter(extraction_identifier),
+            "$or": [
+                {"claim_token": {"$exists": False}},
+                {"claimed_at": {"$lt": now - timedelta(seconds=MONGO_CLAIM_TIMEOUT)}},
+            ],
+        }
+        candidates = collection.find(claimable, {"_id": 1}).sort("_id", pymongo.ASCENDING).limit(batch_size)
+        candidates_ids = [document["_id"] for document in candidates]
+        if not candidates_ids:
+            return None
+
+        claimable["_id"] = {"$in": candidates_ids}
+        collection.update_many(claimable, {"$set": {"claim_token": claim_token, "claimed_at": now}})
+        claimed = {"_id": {"$in": candidates_ids}, "claim_token": claim_token}
+        documents = collection.find(claimed).sort("_id", pymongo.ASCENDING)
+        return [self.expand_segment_boxes(document) for document in documents]
+
+    def renew_claim(self, collection_name: str, claimed: dict, claimed_count: int):
+        renewed = self.mongo_db[collection_name].update_many(claimed, {"$set": {"claimed_at": datetime.now(timezone.utc)}})
+        if renewed.matched_count != claimed_count:
+            raise RuntimeError(f"Claim on {collection_name} expired and was taken by another consumer")
+
+    def claim_and_delete(
+        self,
+        extraction_identifier: ExtractionIdentifier,
+        collection_name: str,
+        data_class: type[BaseModel],
+        batch_size: int = None,
+        limit: int = None,
+    ) -> list[BaseModel]:
+        collection = self.mongo_db[collection_name]
+        batch_size = batch_size or self.claim_batch_size
+        claim_token = uuid.uuid4().hex
+        claimed = {**self.get_filter(extraction_identifier), "claim_token": claim_token}
+        data = list()
+        try:
+            while limit is None or len(data) < limit:
+                self.renew_claim(collection_name, claimed, len(data))
+                documents = self.claim_batch(
+                    extraction_identifier,
+                    collection_name,
+                    claim_token,
+                    batch_size if limit is None else min(batch_size, limit - len(data)),
+                )
+                if documents is None:
+                    break
+                data.extend(data_class(**document) for document in documents)
+
+            self.renew_claim(collection_name, claimed, len(data))
+        except BaseException:
+            collection.update_many(claimed, {"$unset": {"claim_token": "", "claimed_at": ""}})
+            raise
+
+        collection.delete_many(claimed)
+        return data
+
     def save_prediction_data(self, extraction_identifier: ExtractionIdentifier, prediction_data: PredictionData):
         self.save_data(extraction_identifier, prediction_data, "prediction_data")
 
+    def save_prediction_data_list(
+        self, extraction_identifier: ExtractionIdentifier, prediction_data_list: list[PredictionData]
+    ):
+        self.save_data_list(extraction_identifier, prediction_data_list, "prediction_data")
+
     def load_prediction_data(self, extraction_identifier: ExtractionIdentifier) -> list[PredictionData]:
         data = self.mongo_db.prediction_data.find(self.get_filter(extraction_identifier))
-        prediction_data = [PredictionData(**document) for document in data]
+        prediction_data = [PredictionData(**self.expand_segment_boxes(document)) for document in data]
         self.mongo_db.prediction_data.delete_many(self.get_filter(extraction_identifier))
         return prediction_data
 
     def load_and_delete_prediction_data(self, extraction_identifier: ExtractionIdentifier) -> list[PredictionData]:
-        data_cursor = self.mongo_db.prediction_data.find(self.get_filter(extraction_identifier))
-        data = list(data_cursor)
-        prediction_data = [PredictionData(**document) for document in data]
-        ids_to_delete = [document["_id"] for document in data]
-        self.mongo_db.prediction_data.delete_many({"_id": {"$in": ids_to_delete}})
-        return prediction_data
+        return self.claim_and_delete(extraction_identifier, "prediction_data", PredictionData)
+
+    def load_and_delete_prediction_data_page(
+        self, extraction_identifier: ExtractionIdentifier, limit: int
+    ) -> list[PredictionData]:
+        return self.claim_and_delete(extraction_identifier, "prediction_data", PredictionData, limit=limit)
 
     def save_labeled_data(self, extraction_identifier: ExtractionIdentifier, labeled_data: LabeledData):
         self.save_data(extraction_identifier, labeled_data, "labeled_data")
 
+    def save_labeled_data_list(self, extraction_identifier: ExtractionIdentifier, labeled_data_list: list[LabeledData]):
+        self.save_data_list(extraction_identifier, labeled_data_list, "labeled_data")
+
     def delete_labeled_data(self, extraction_identifier: ExtractionIdentifier):
         self.mongo_db.labeled_data.delete_many(self.get_filter(extraction_identifier))
 
     def load_labeled_data(self, extraction_identifier: ExtractionIdentifier) -> list[LabeledData]:
         data = self.mongo_db.labeled_data.find(self.get_filter(extraction_identifier))
-        labeled_data = [LabeledData(**document) for document in data]
+        labeled_data = [LabeledData(**self.expand_segment_boxes(document)) for document in data]
         self.mongo_db.labeled_data.delete_many(self.get_filter(extraction_identifier))
         return labeled_data
 
     def load_and_delete_labeled_data(self, extraction_identifier: ExtractionIdentifier) -> list[LabeledData]:
-        data_cursor = self.mongo_db.labeled_data.find(self.get_filter(extraction_identifier))
-        data = list(data_cursor)
-        labeled_data = [LabeledData(**document) for document in data]
-        ids_to_delete = [document["_id"] for document in data]
-        self.mongo_db.labeled_data.delete_many({"_id": {"$in": ids_to_delete}})
-        return labeled_data
+        return self.claim_and_delete(extraction_identifier, "labeled_data", LabeledData)
 
     def save_suggestions(self, extraction_identifier: ExtractionIdentifier, suggestions: list[Suggestion]):
-        for suggestion in suggestions:
-            self.save_data(extraction_identifier, suggestion, "suggestions")
+        self.save_data_list(extraction_identifier, suggestions, "suggestions")
 
     def load_suggestions(self, extraction_identifier: ExtractionIdentifier) -> list[Suggestion]:
         suggestions: list[Suggestion] = list()
@@ -91,6 +253,22 @@ class MongoPersistenceRepository(PersistenceRepository):
 
         return suggestions
 
+    def load_suggestions_page(
+        self, extraction_identifier: ExtractionIdentifier, after_id: Optional[str], page_size: int
+    ) -> tuple[Optional[str], list[Suggestion]]:
+        query = self.get_filter(extraction_identifier)
+        if after_id is not None:
+            query["_id"] = {"$gt": ObjectId(after_id)}
+
+        documents = list(self.mongo_db.suggestions.find(query).sort("_id", pymongo.ASCENDING).limit(page_size))
+        last_id = str(documents[-1]["_id"]) if documents else after_id
+        return last_id, [Suggestion(**document) for document in documents]
+
+    def delete_suggestions_up_to(self, extraction_identifier: ExtractionIdentifier, after_id: str):
+        self.mongo_db.suggestions.delete_many(
+            {**self.get_filter(extraction_identifier), "_id": {"$lte": ObjectId(after_id)}}
+        )
+
     def save_paragraph_extraction_data(
         self, extraction_identifier: ExtractionIdentifier, paragraph_extraction_data: ParagraphExtractionData
     ):
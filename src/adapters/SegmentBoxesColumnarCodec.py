@@ -0,0 +1,79 @@
+import sys
+from array import array
+from enum import Enum
+from typing import Any, Optional
+
+import msgpack
+import zstandard
+
+
+class SegmentBoxesColumnarCodec:
+    def __init__(self, compress: bool = True, level: int = 3):
+        self.compress = compress
+        self.level = level
+
+    @staticmethod
+    def is_encoded(value: Any) -> bool:
+        return isinstance(value, dict) and "columnar_segment_boxes" in value
+
+    @staticmethod
+    def pack_numbers(values: list, typecode: str) -> bytes:
+        column = array(typecode, values)
+        if sys.byteorder != "little":
+            column.byteswap()
+        return column.tobytes()
+
+    @staticmethod
+    def unpack_numbers(content: bytes, typecode: str) -> list:
+        column = array(typecode)
+        column.frombytes(content)
+        if sys.byteorder != "little":
+            column.byteswap()
+        return column.tolist()
+
+    def encode_column(self, values: list) -> Optional[list]:
+        if all(type(value) is float for value in values):
+            return ["d", self.pack_numbers(values, "d"), None]
+
+        if all(type(value) is int for value in values) and all(-(2**63) <= value < 2**63 for value in values):
+            return ["q", self.pack_numbers(values, "q"), None]
+
+        values = [value.value if isinstance(value, Enum) else value for value in values]
+        labels_types = {type(value) for value in values if value is not None}
+        if len(labels_types) > 1 or not labels_types <= {str, int, float, bool}:
+            return None
+
+        labels = list(dict.fromkeys(values))
+        labels_indexes = {label: index for index, label in enumerate(labels)}
+        typecode = "H" if len(labels) <= 2**16 else "I"
+        return [typecode, self.pack_numbers([labels_indexes[value] for value in values], typecode), labels]
+
+    def encode(self, boxes: list[dict]) -> Optional[dict]:
+        names = list(boxes[0])
+        if not names or any(box.keys() != boxes[0].keys() for box in boxes):
+            return None
+
+        columns = dict()
+        for name in names:
+            column = self.encode_column([box[name] for box in boxes])
+            if column is None:
+                return None
+            columns[name] = column
+
+        content = msgpack.packb(columns, use_bin_type=True)
+        if self.compress:
+            content = zstandard.ZstdCompressor(level=self.level).compress(content)
+
+        return {"columnar_segment_boxes": 1, "compressed": self.compress, "count": len(boxes), "data": content}
+
+    def decode(self, value: dict) -> list[dict]:
+        content = value["data"]
+        if value["compressed"]:
+            content = zstandard.ZstdDecompressor().decompress(content)
+
+        columns = dict()
+        for name, (typecode, packed_values, labels) in msgpack.unpackb(content, raw=False).items():
+            column_values = self.unpack_numbers(packed_values, typecode)
+            columns[name] = [labels[index] for index in column_values] if labels is not None else column_values
+
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
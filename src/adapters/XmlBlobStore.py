@@ -0,0 +1,77 @@
+import os
+import re
+from pathlib import Path
+
+from config import XML_BLOBS_PATH
+from ports.XmlBlobStorage import XmlBlobStorage
+
+XML_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class XmlBlobStore(XmlBlobStorage):
+    def __init__(self, tenant: str = "", root_path: str | Path = XML_BLOBS_PATH):
+        self.root_path = Path(root_path)
+        self.blobs_path = Path(root_path, tenant)
+
+    @staticmethod
+    def is_valid_hash(xml_hash: str) -> bool:
+        return bool(XML_HASH_PATTERN.match(xml_hash))
+
+    def has_blob(self, xml_hash: str) -> bool:
+        return self.is_valid_hash(xml_hash) and self.get_blob_path(xml_hash).exists()
+
+    def get_missing_hashes(self, xml_hashes: list[str]) -> list[str]:
+        return [xml_hash for xml_hash in dict.fromkeys(xml_hashes) if not self.has_blob(xml_hash)]
+
+    def get_blob_path(self, xml_hash: str) -> Path:
+        return self.blobs_path / xml_hash[:2] / f"{xml_hash}.xml"
+
+    @staticmethod
+    def replace_with_link(source_path: Path, destination_path: Path):
+        link_path = destination_path.with_name(f"{destination_path.name}.link")
+        os.link(source_path, link_path)
+        try:
+            os.replace(link_path, destination_path)
+        except BaseException:
+            link_path.unlink(missing_ok=True)
+            raise
+
+    def save(self, temporary_path: str | Path, destination_path: str | Path, xml_hash: str):
+        blob_path = self.get_blob_path(xml_hash)
+        try:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            os.link(temporary_path, blob_path)
+        except FileExistsError:
+            try:
+                self.replace_with_link(blob_path, Path(temporary_path))
+            except OSError:
+                pass
+        except OSError:
+            pass
+
+        os.replace(temporary_path, destination_path)
+
+    def attach(self, xml_hash: str, destination_path: str | Path) -> bool:
+        if not self.is_valid_hash(xml_hash):
+            return False
+
+        try:
+            Path(destination_path).parent.mkdir(parents=True, exist_ok=True)
+            self.replace_with_link(self.get_blob_path(xml_hash), Path(destination_path))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def get_references_count(self, xml_hash: str) -> int:
+        try:
+            return self.get_blob_path(xml_hash).stat().st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def cleanup(self):
+        for blob_path in self.root_path.glob("*/*/*.xml"):
+            try:
+                if blob_path.stat().st_nlink <= 1:
+                    blob_path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
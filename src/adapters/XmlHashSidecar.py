@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from trainable_entity_extractor.domain.XmlFile import XmlFile
+
+from ports.XmlHashStorage import XmlHashStorage
+
+
+class XmlHashSidecar(XmlHashStorage):
+    @staticmethod
+    def get_sidecar_path(xml_file: XmlFile) -> Path:
+        xml_file_path = Path(xml_file.xml_file_path)
+        return xml_file_path.parent.parent / f"{xml_file_path.parent.name}_hashes" / f"{xml_file_path.name}.json"
+
+    def get_xml_hash(self, xml_file: XmlFile) -> Optional[str]:
+        try:
+            sidecar = json.loads(self.get_sidecar_path(xml_file).read_bytes())
+            xml_stat = os.stat(xml_file.xml_file_path)
+        except (OSError, ValueError):
+            return None
+
+        if (xml_stat.st_size, xml_stat.st_mtime_ns) != (sidecar.get("xml_size"), sidecar.get("xml_mtime_ns")):
+            return None
+
+        return sidecar.get("xml_hash")
+
+    def save_xml_hash(self, xml_file: XmlFile, xml_hash: str):
+        sidecar_path = self.get_sidecar_path(xml_file)
+        xml_stat = os.stat(xml_file.xml_file_path)
+        content = json.dumps({"xml_hash": xml_hash, "xml_size": xml_stat.st_size, "xml_mtime_ns": xml_stat.st_mtime_ns})
+        sidecar_path.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=sidecar_path.parent, prefix=f".{sidecar_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "w") as f:
+                f.write(content)
+            os.replace(temporary_path, sidecar_path)
+        except BaseException:
+            Path(temporary_path).unlink(missing_ok=True)
+            raise
+
+    def delete(self, xml_file: XmlFile):
+        self.get_sidecar_path(xml_file).unlink(missing_ok=True)
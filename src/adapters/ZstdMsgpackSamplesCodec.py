@@ -0,0 +1,20 @@
+import msgpack
+import zstandard
+
+from ports.SamplesCodec import SamplesCodec
+
+
+class ZstdMsgpackSamplesCodec(SamplesCodec):
+    name = "zstd-msgpack"
+    media_type = "application/x-msgpack"
+    content_encoding = "zstd"
+
+    def __init__(self, level: int = 3):
+        self.level = level
+
+    def encode(self, samples: list[dict]) -> bytes:
+        compressor = zstandard.ZstdCompressor(level=self.level, threads=-1)
+        return compressor.compress(msgpack.packb(samples, use_bin_type=True))
+
+    def decode(self, content: bytes) -> list[dict]:
+        return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(content), raw=False)
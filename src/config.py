@@ -13,6 +13,33 @@ REDIS_HOST = os.environ.get("REDIS_HOST", "127.0.0.1")
 REDIS_PORT = os.environ.get("REDIS_PORT", "6379")
 MONGO_HOST = os.environ.get("MONGO_HOST", "mongodb://127.0.0.1")
 MONGO_PORT = os.environ.get("MONGO_PORT", "29017")
+MONGO_WRITE_BATCH_SIZE = int(os.environ.get("MONGO_WRITE_BATCH_SIZE", "1000"))
+MONGO_TRANSIENT_DATA_TTL = int(os.environ.get("MONGO_TRANSIENT_DATA_TTL", "0"))
+MONGO_CLAIM_BATCH_SIZE = int(os.environ.get("MONGO_CLAIM_BATCH_SIZE", "1000"))
+MONGO_CLAIM_TIMEOUT = int(os.environ.get("MONGO_CLAIM_TIMEOUT", "600"))
+SEGMENT_BOXES_COLUMNAR_THRESHOLD = int(os.environ.get("SEGMENT_BOXES_COLUMNAR_THRESHOLD", "256"))
+SEGMENT_BOXES_COMPRESSION = os.environ.get("SEGMENT_BOXES_COMPRESSION", "true").lower().strip() == "true"
+MONGO_MAX_WORKERS = int(os.environ.get("MONGO_MAX_WORKERS", "8"))
+SUGGESTIONS_PAGE_SIZE = int(os.environ.get("SUGGESTIONS_PAGE_SIZE", "1000"))
+SAMPLES_CACHE_MAX_BYTES = int(os.environ.get("SAMPLES_CACHE_MAX_BYTES", str(20 * 1024**3)))
+SAMPLES_MEMORY_CACHE_SIZE = int(os.environ.get("SAMPLES_MEMORY_CACHE_SIZE", "1"))
+SAMPLES_CACHE_CLEANUP_INTERVAL = int(os.environ.get("SAMPLES_CACHE_CLEANUP_INTERVAL", "300"))
+AVAILABLE_CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+SAMPLES_PARSING_PROCESSES = int(os.environ.get("SAMPLES_PARSING_PROCESSES", str(min(AVAILABLE_CPUS, 4))))
+SAMPLES_PARSING_MIN_DOCUMENTS = int(os.environ.get("SAMPLES_PARSING_MIN_DOCUMENTS", "4"))
+SAMPLES_BUILD_WORKERS = int(os.environ.get("SAMPLES_BUILD_WORKERS", "2"))
+SAMPLES_BUILD_QUEUE_SIZE = int(os.environ.get("SAMPLES_BUILD_QUEUE_SIZE", "16"))
+SAMPLES_REQUEST_DEADLINE = int(os.environ.get("SAMPLES_REQUEST_DEADLINE", "3600"))
+PDF_DATA_CACHE_TTL = int(os.environ.get("PDF_DATA_CACHE_TTL", str(7 * 86400)))
+PDF_DATA_CACHE_MAX_BYTES = int(os.environ.get("PDF_DATA_CACHE_MAX_BYTES", str(5 * 1024**3)))
+SAMPLES_WARMING_DELAY = float(os.environ.get("SAMPLES_WARMING_DELAY", "5"))
+SAMPLES_WARMING_TTL = int(os.environ.get("SAMPLES_WARMING_TTL", "3600"))
+SAMPLES_WARMING_MAX_EXTRACTORS = int(os.environ.get("SAMPLES_WARMING_MAX_EXTRACTORS", "64"))
+SAMPLES_WARMING_WORKERS = int(os.environ.get("SAMPLES_WARMING_WORKERS", "1"))
+SAMPLES_WARMING_QUEUE_SIZE = int(os.environ.get("SAMPLES_WARMING_QUEUE_SIZE", "4"))
+SAMPLES_WARMING_NICENESS = int(os.environ.get("SAMPLES_WARMING_NICENESS", "10"))
+MAX_DECOMPRESSED_REQUEST_SIZE = int(os.environ.get("MAX_DECOMPRESSED_REQUEST_SIZE", str(1024**3)))
+PREDICTION_SAMPLES_CHUNK_SIZE = int(os.environ.get("PREDICTION_SAMPLES_CHUNK_SIZE", "500"))
 SENTRY_DSN = os.environ.get("SENTRY_DSN")
 ENVIRONMENT = os.environ.get("ENVIRONMENT", "development")
 
@@ -21,4 +48,6 @@ ROOT_PATH = Path(__file__).parent.parent.absolute()
 MODELS_DATA_PATH = join(ROOT_PATH, "models_data")
 DATA_PATH = join(ROOT_PATH, "data")
 LAST_RUN_PATH = Path(DATA_PATH, "last_run_data")
+XML_BLOBS_PATH = join(MODELS_DATA_PATH, "cache", "xml_blobs")
+XML_DEDUPLICATION = os.environ.get("XML_DEDUPLICATION", "true").lower().strip() == "true"
 NO_GPU = os.environ.get("NO_GPU", "false").lower().strip() == "true"
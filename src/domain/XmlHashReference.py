@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class XmlHashReference(BaseModel):
+    xml_file_name: str
+    xml_hash: str
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import mongomock
+from mongomock.collection import Collection
+
+from adapters.AsyncMongoPersistenceRepository import AsyncMongoPersistenceRepository
+from config import MONGO_HOST, MONGO_PORT
+from drivers.rest.app import app
+
+MONGO_ROUND_TRIP_SECONDS = 0.02
+CONCURRENT_REQUESTS = 200
+
+
+class BlockingMongoPersistenceRepository(AsyncMongoPersistenceRepository):
+    async def run(self, method, *args, **kwargs):
+        return method(*args, **kwargs)
+
+
+def with_round_trip(method):
+    def slow_method(*args, **kwargs):
+        time.sleep(MONGO_ROUND_TRIP_SECONDS)
+        return method(*args, **kwargs)
+
+    return slow_method
+
+
+def get_prediction_data(index: int) -> dict:
+    return {
+        "tenant": "benchmark_tenant",
+        "id": "benchmark_extraction",
+        "xml_file_name": f"document_{index}.xml",
+        "page_width": 612,
+        "page_height": 792,
+        "xml_segments_boxes": [
+            {"left": 1, "top": 2, "width": 3, "height": 4, "page_width": 612, "page_height": 792, "page_number": 1}
+        ],
+    }
+
+
+async def send_requests() -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *[client.post("/prediction_data", json=get_prediction_data(i)) for i in range(CONCURRENT_REQUESTS)]
+        )
+        elapsed = time.perf_counter() - start
+
+    assert all(response.status_code == 200 for response in responses)
+    return elapsed
+
+
+def benchmark(repository_class: type[AsyncMongoPersistenceRepository]):
+    with mongomock.patch(servers=[f"{MONGO_HOST}:{MONGO_PORT}"]):
+        with patch.object(Collection, "insert_one", with_round_trip(Collection.insert_one)):
+            app.persistence_repository = repository_class()
+            elapsed = asyncio.run(send_requests())
+            app.persistence_repository.close()
+
+    print(
+        f"{repository_class.__name__}: {CONCURRENT_REQUESTS} requests in {round(elapsed, 2)}s "
+        f"({round(CONCURRENT_REQUESTS / elapsed)} requests/s)"
+    )
+
+
+if __name__ == "__main__":
+    print(f"Simulated Mongo round trip: {MONGO_ROUND_TRIP_SECONDS * 1000}ms")
+    benchmark(BlockingMongoPersistenceRepository)
+    benchmark(AsyncMongoPersistenceRepository)
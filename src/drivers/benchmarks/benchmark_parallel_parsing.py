@@ -0,0 +1,75 @@
+import shutil
+import sys
+from pathlib import Path
+
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.PredictionData import PredictionData
+from trainable_entity_extractor.domain.SegmentationData import SegmentationData
+from trainable_entity_extractor.domain.XmlFile import XmlFile
+
+from adapters.XmlHashSidecar import XmlHashSidecar
+from config import APP_PATH, MODELS_DATA_PATH, SAMPLES_PARSING_PROCESSES
+from drivers.benchmarks.benchmark_samples_transport import measure
+from drivers.samples_codecs import SAMPLES_CODECS
+from use_cases.PdfDataCacheUseCase import PdfDataCacheUseCase
+from use_cases.SampleProcessorUseCase import SampleProcessorUseCase
+
+BENCHMARK_RUN_NAME = "parallel_parsing_benchmark"
+DOCUMENTS_COUNTS = [4, 16, 64, 256]
+TEST_XML_PATH = Path(APP_PATH, "tests", "resources", "tenant_test", "extraction_id", "xml_to_predict", "test.xml")
+
+
+def get_xml_files(extraction_identifier: ExtractionIdentifier, xml_path: Path, documents_count: int) -> list[XmlFile]:
+    xml_files = list()
+    for document_index in range(documents_count):
+        xml_file = XmlFile(
+            extraction_identifier=extraction_identifier, to_train=False, xml_file_name=f"document_{document_index}.xml"
+        )
+        Path(xml_file.xml_file_path).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(xml_path, xml_file.xml_file_path)
+        xml_files.append(xml_file)
+    return xml_files
+
+
+def benchmark_parallel_parsing(xml_path: Path = TEST_XML_PATH):
+    extraction_identifier = ExtractionIdentifier(
+        run_name=BENCHMARK_RUN_NAME, extraction_name="extraction_id", output_path=MODELS_DATA_PATH
+    )
+    sequential_processor = SampleProcessorUseCase(
+        extraction_identifier, SAMPLES_CODECS, XmlHashSidecar(), parallel_parsing=False, cache_pdf_data=False
+    )
+    parallel_processor = SampleProcessorUseCase(
+        extraction_identifier, SAMPLES_CODECS, XmlHashSidecar(), parallel_parsing=True, cache_pdf_data=False
+    )
+    parallel_processor.get_parsing_pool()
+
+    print(f"Parsing {xml_path} with {SAMPLES_PARSING_PROCESSES} processes")
+    try:
+        for documents_count in DOCUMENTS_COUNTS:
+            xml_files = get_xml_files(extraction_identifier, xml_path, documents_count)
+            segmentation_data_list = [SegmentationData.from_prediction_data(PredictionData())] * documents_count
+            page_numbers_list = [None] * documents_count
+            arguments = (xml_files, segmentation_data_list, page_numbers_list)
+
+            sequential_time, sequential_pdf_data = measure(sequential_processor.parse_pdf_data_list, *arguments)
+            parallel_time, parallel_pdf_data = measure(parallel_processor.parse_pdf_data_list, *arguments)
+            cached_processor = SampleProcessorUseCase(
+                extraction_identifier, SAMPLES_CODECS, XmlHashSidecar(), parallel_parsing=False
+            )
+            cached_processor.parse_pdf_data_list(*arguments)
+            cached_time, cached_pdf_data = measure(cached_processor.parse_pdf_data_list, *arguments)
+
+            assert sequential_pdf_data == parallel_pdf_data == cached_pdf_data
+            print(
+                f"{documents_count:>5} documents  sequential {sequential_time:.3f}s  parallel {parallel_time:.3f}s  "
+                f"speedup {sequential_time / parallel_time:.2f}x  cached {cached_time:.3f}s"
+            )
+    finally:
+        shutil.rmtree(Path(MODELS_DATA_PATH, BENCHMARK_RUN_NAME), ignore_errors=True)
+        shutil.rmtree(
+            PdfDataCacheUseCase(SAMPLES_CODECS[0], XmlHashSidecar(), BENCHMARK_RUN_NAME).cache_dir, ignore_errors=True
+        )
+
+
+if __name__ == "__main__":
+    benchmark_parallel_parsing(Path(sys.argv[1]) if len(sys.argv) > 1 else TEST_XML_PATH)
@@ -0,0 +1,24 @@
+from drivers.benchmarks.benchmark_samples_transport import get_samples, measure
+from drivers.samples_codecs import SAMPLES_CODECS
+from use_cases.SamplesCacheUseCase import SamplesCacheUseCase
+
+BENCHMARK_CACHE_KEY = "samples_benchmark_cache"
+
+
+def benchmark_samples_cache():
+    samples = get_samples()
+
+    for samples_codec in SAMPLES_CODECS:
+        samples_cache = SamplesCacheUseCase([samples_codec])
+        write_time, _ = measure(samples_cache.cache_samples, BENCHMARK_CACHE_KEY, samples)
+        read_time, cached_samples = measure(samples_cache.get_cached_samples, BENCHMARK_CACHE_KEY)
+        file_path, _, _ = samples_cache.get_valid_cache_file(BENCHMARK_CACHE_KEY)
+        file_size = file_path.stat().st_size
+        samples_cache.delete_cache(BENCHMARK_CACHE_KEY)
+
+        assert cached_samples == samples
+        print(f"{samples_codec.name:<14} {file_size / 1e6:>9.2f} MB  write {write_time:.3f}s  read {read_time:.3f}s")
+
+
+if __name__ == "__main__":
+    benchmark_samples_cache()
@@ -0,0 +1,84 @@
+import gzip
+import json
+import random
+import time
+from pathlib import Path
+
+from config import LAST_RUN_PATH
+from drivers.samples_codecs import SAMPLES_CODECS
+
+REPETITIONS = 3
+
+
+def get_synthetic_samples(samples_count: int = 200, boxes_per_sample: int = 2000) -> list[dict]:
+    random.seed(42)
+    segment_types = ["Text", "Title", "Footnote", "Page header", "List item"]
+    return [
+        {
+            "labeled_data": {
+                "tenant": "benchmark_tenant",
+                "id": "benchmark_extraction",
+                "xml_file_name": f"document_{sample_index}.xml",
+                "label_text": f"label {sample_index}",
+                "page_width": 612.0,
+                "page_height": 792.0,
+                "xml_segments_boxes": [
+                    {
+                        "left": round(random.uniform(0, 612), 2),
+                        "top": round(random.uniform(0, 792), 2),
+                        "width": round(random.uniform(10, 500), 2),
+                        "height": round(random.uniform(5, 80), 2),
+                        "page_width": 612,
+                        "page_height": 792,
+                        "page_number": random.randint(1, 600),
+                        "segment_type": random.choice(segment_types),
+                    }
+                    for _ in range(boxes_per_sample)
+                ],
+                "label_segments_boxes": [],
+            },
+            "segment_selector_texts": [f"label {sample_index}"],
+        }
+        for sample_index in range(samples_count)
+    ]
+
+
+def get_samples() -> list[dict]:
+    last_run_training_data = Path(LAST_RUN_PATH, "training_data.json.gz")
+    if last_run_training_data.exists():
+        print(f"Using last run training data from {last_run_training_data}")
+        with gzip.open(last_run_training_data, "rt", encoding="utf-8") as file:
+            return json.load(file)
+
+    print("Using synthetic training samples")
+    return get_synthetic_samples()
+
+
+def measure(function, *args) -> tuple[float, object]:
+    best_time = float("inf")
+    result = None
+    for _ in range(REPETITIONS):
+        start = time.perf_counter()
+        result = function(*args)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, result
+
+
+def benchmark_samples_transport():
+    samples = get_samples()
+
+    encode_time, json_content = measure(lambda x: json.dumps(x).encode("utf-8"), samples)
+    decode_time, _ = measure(json.loads, json_content)
+    print(f"{'plain-json':<14} {len(json_content) / 1e6:>9.2f} MB  encode {encode_time:.3f}s  decode {decode_time:.3f}s")
+
+    for samples_codec in SAMPLES_CODECS:
+        encode_time, content = measure(samples_codec.encode, samples)
+        decode_time, decoded_samples = measure(samples_codec.decode, content)
+        assert decoded_samples == samples
+        print(
+            f"{samples_codec.name:<14} {len(content) / 1e6:>9.2f} MB  encode {encode_time:.3f}s  decode {decode_time:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_samples_transport()
@@ -0,0 +1,51 @@
+import bson
+import mongomock
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.LabeledData import LabeledData
+
+from adapters.MongoPersistenceRepository import MongoPersistenceRepository
+from adapters.SegmentBoxesColumnarCodec import SegmentBoxesColumnarCodec
+from config import MONGO_HOST, MONGO_PORT, MODELS_DATA_PATH
+from drivers.benchmarks.benchmark_samples_transport import measure, get_synthetic_samples
+
+BOXES_PER_DOCUMENT = [1000, 10000, 50000]
+STORAGE_FORMATS = {
+    "documents": dict(columnar_threshold=0),
+    "columnar": dict(segment_boxes_codec=SegmentBoxesColumnarCodec(compress=False)),
+    "columnar zstd": dict(segment_boxes_codec=SegmentBoxesColumnarCodec(compress=True)),
+}
+
+
+def encode_document(persistence_repository: MongoPersistenceRepository, extraction_identifier, labeled_data) -> bytes:
+    document = persistence_repository.inject_extractor_identifier(
+        extraction_identifier, persistence_repository.dump_data(labeled_data)
+    )
+    return bson.encode(document)
+
+
+def load_document(persistence_repository: MongoPersistenceRepository, content: bytes) -> LabeledData:
+    return LabeledData(**persistence_repository.expand_segment_boxes(bson.decode(content)))
+
+
+def benchmark_segment_boxes_storage():
+    extraction_identifier = ExtractionIdentifier(
+        run_name="benchmark_tenant", extraction_name="benchmark_extraction", output_path=MODELS_DATA_PATH
+    )
+    with mongomock.patch(servers=[f"{MONGO_HOST}:{MONGO_PORT}"]):
+        for boxes_per_document in BOXES_PER_DOCUMENT:
+            labeled_data = LabeledData(**get_synthetic_samples(1, boxes_per_document)[0]["labeled_data"])
+            print(f"{boxes_per_document} segment boxes")
+            for storage_format, arguments in STORAGE_FORMATS.items():
+                persistence_repository = MongoPersistenceRepository(**arguments)
+                encode_time, content = measure(encode_document, persistence_repository, extraction_identifier, labeled_data)
+                load_time, loaded_data = measure(load_document, persistence_repository, content)
+
+                assert loaded_data.model_dump() == labeled_data.model_dump()
+                print(
+                    f"  {storage_format:<14} {len(content) / 1024:>10.1f} KiB  "
+                    f"encode {encode_time * 1000:>8.1f} ms  load {load_time * 1000:>8.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    benchmark_segment_boxes_storage()
@@ -0,0 +1,80 @@
+import time
+from unittest.mock import patch
+
+import mongomock
+from mongomock.collection import Collection
+from pdf_token_type_labels.TokenType import TokenType
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.SegmentBox import SegmentBox
+from trainable_entity_extractor.domain.Suggestion import Suggestion
+
+from adapters.MongoPersistenceRepository import MongoPersistenceRepository
+from config import MONGO_HOST, MONGO_PORT, MODELS_DATA_PATH
+
+MONGO_ROUND_TRIP_SECONDS = 0.001
+SUGGESTIONS_COUNT = 20000
+BATCH_SIZES = [100, 1000, 5000]
+
+
+def with_round_trip(method):
+    def slow_method(*args, **kwargs):
+        time.sleep(MONGO_ROUND_TRIP_SECONDS)
+        return method(*args, **kwargs)
+
+    return slow_method
+
+
+def get_suggestions() -> list[Suggestion]:
+    segment_box = SegmentBox(
+        left=1, top=2, width=3, height=4, page_width=612, page_height=792, page_number=1, segment_type=TokenType.TEXT
+    )
+    return [
+        Suggestion(
+            tenant="benchmark_tenant",
+            id="benchmark_extraction",
+            xml_file_name=f"document_{index}.xml",
+            entity_name=f"entity_{index}",
+            text=f"suggestion {index}",
+            segment_text=f"segment text {index}",
+            page_number=1,
+            segments_boxes=[segment_box],
+        )
+        for index in range(SUGGESTIONS_COUNT)
+    ]
+
+
+def save_one_by_one(repository: MongoPersistenceRepository, extraction_identifier: ExtractionIdentifier, suggestions):
+    for suggestion in suggestions:
+        repository.save_data(extraction_identifier, suggestion, "suggestions")
+
+
+def measure_writes(save_suggestions, *args) -> float:
+    start = time.perf_counter()
+    save_suggestions(*args)
+    return time.perf_counter() - start
+
+
+def benchmark_suggestions_writes():
+    suggestions = get_suggestions()
+    extraction_identifier = ExtractionIdentifier(
+        run_name="benchmark_tenant", extraction_name="benchmark_extraction", output_path=MODELS_DATA_PATH
+    )
+    print(f"{SUGGESTIONS_COUNT} suggestions, {MONGO_ROUND_TRIP_SECONDS * 1000:.1f} ms simulated round trip")
+
+    with mongomock.patch(servers=[f"{MONGO_HOST}:{MONGO_PORT}"]):
+        with patch.object(Collection, "insert_one", with_round_trip(Collection.insert_one)):
+            with patch.object(Collection, "insert_many", with_round_trip(Collection.insert_many)):
+                repository = MongoPersistenceRepository()
+                elapsed = measure_writes(save_one_by_one, repository, extraction_identifier, suggestions)
+                print(f"{'insert_one':<18} {elapsed:.3f}s  {SUGGESTIONS_COUNT / elapsed:>10.0f} suggestions/s")
+
+                for batch_size in BATCH_SIZES:
+                    repository = MongoPersistenceRepository(write_batch_size=batch_size)
+                    elapsed = measure_writes(repository.save_suggestions, extraction_identifier, suggestions)
+                    print(
+                        f"{f'insert_many {batch_size}':<18} {elapsed:.3f}s  {SUGGESTIONS_COUNT / elapsed:>10.0f} suggestions/s"
+                    )
+
+
+if __name__ == "__main__":
+    benchmark_suggestions_writes()
@@ -0,0 +1,67 @@
+from enum import Enum
+from typing import get_args, get_origin
+
+from pydantic import BaseModel
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.LabeledData import LabeledData
+
+from adapters.MongoPersistenceRepository import MongoPersistenceRepository
+from config import MODELS_DATA_PATH
+from drivers.benchmarks.benchmark_samples_transport import measure, get_synthetic_samples
+
+DOCUMENTS_COUNT = 50
+BOXES_PER_DOCUMENT = [100, 1000, 5000]
+
+
+def construct_value(annotation, value):
+    if get_origin(annotation) is list and isinstance(get_args(annotation)[0], type):
+        return [construct_value(get_args(annotation)[0], item) for item in value]
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return construct_model(annotation, value)
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return annotation(value)
+    return value
+
+
+def construct_model(model_class: type[BaseModel], document: dict) -> BaseModel:
+    return model_class.model_construct(
+        **{
+            name: construct_value(field.annotation, document[name])
+            for name, field in model_class.model_fields.items()
+            if name in document
+        }
+    )
+
+
+def validate_documents(documents: list[dict]) -> list[LabeledData]:
+    return [LabeledData(**document) for document in documents]
+
+
+def construct_documents(documents: list[dict]) -> list[LabeledData]:
+    return [construct_model(LabeledData, document) for document in documents]
+
+
+def benchmark_trusted_load():
+    extraction_identifier = ExtractionIdentifier(
+        run_name="benchmark_tenant", extraction_name="benchmark_extraction", output_path=MODELS_DATA_PATH
+    )
+    for boxes_per_document in BOXES_PER_DOCUMENT:
+        documents = [
+            MongoPersistenceRepository.inject_extractor_identifier(
+                extraction_identifier, LabeledData(**sample["labeled_data"]).model_dump()
+            )
+            for sample in get_synthetic_samples(DOCUMENTS_COUNT, boxes_per_document)
+        ]
+
+        validated_time, validated_data = measure(validate_documents, documents)
+        constructed_time, constructed_data = measure(construct_documents, documents)
+
+        assert [x.model_dump() for x in validated_data] == [x.model_dump() for x in constructed_data]
+        print(
+            f"{DOCUMENTS_COUNT} documents x {boxes_per_document:>5} boxes  validated {validated_time:.3f}s  "
+            f"model_construct {constructed_time:.3f}s  speedup {validated_time / constructed_time:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_trusted_load()
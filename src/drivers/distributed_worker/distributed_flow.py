@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime
 from pathlib import Path
 from time import sleep
@@ -17,8 +18,10 @@ from trainable_entity_extractor.use_cases.PredictUseCase import PredictUseCase
 from trainable_entity_extractor.use_cases.TrainUseCase import TrainUseCase
 
 from adapters.CloudModelStorage import CloudModelStorage
-from config import SERVICE_HOST, SERVICE_PORT, MODELS_DATA_PATH
+from adapters.XmlHashSidecar import XmlHashSidecar
+from config import SERVICE_HOST, SERVICE_PORT, MODELS_DATA_PATH, PREDICTION_SAMPLES_CHUNK_SIZE
 from drivers.extractors import EXTRACTORS
+from drivers.samples_codecs import SAMPLES_CODECS
 from use_cases.SampleProcessorUseCase import SampleProcessorUseCase
 
 
@@ -36,6 +39,10 @@ if GoogleCloudStorage.could_be_configured():
 cloud_storage = CloudModelStorage(google_cloud_storage, logger)
 
 
+def get_sample_processor(extraction_identifier: ExtractionIdentifier) -> SampleProcessorUseCase:
+    return SampleProcessorUseCase(extraction_identifier, SAMPLES_CODECS, XmlHashSidecar())
+
+
 def ensure_fresh_model_folder(extraction_identifier: ExtractionIdentifier, max_age_hours: int = 1) -> None:
     path = Path(extraction_identifier.get_path())
 
@@ -88,7 +95,7 @@ def performance_one_method(extractor_job: TrainableEntityExtractorJob) -> Perfor
     if extractor_job.method_name:
         shutil.rmtree(Path(extraction_identifier.get_path()) / extractor_job.method_name, ignore_errors=True)
 
-    sample_processor = SampleProcessorUseCase(extraction_identifier)
+    sample_processor = get_sample_processor(extraction_identifier)
     samples = sample_processor.get_training_samples()
 
     extraction_data = ExtractionData(
@@ -104,7 +111,7 @@ def train_one_method(extractor_job: TrainableEntityExtractorJob) -> bool:
     extraction_identifier = ExtractionIdentifier(
         run_name=extractor_job.run_name, output_path=MODELS_DATA_PATH, extraction_name=extractor_job.extraction_name
     )
-    sample_processor = SampleProcessorUseCase(extraction_identifier)
+    sample_processor = get_sample_processor(extraction_identifier)
     samples = sample_processor.get_training_samples()
     sample_processor.delete_cache()
     sample_processor.delete_queue_processor_cache()
@@ -132,12 +139,41 @@ def distributed_predict(extractor_job: TrainableEntityExtractorJob) -> bool:
     if not success:
         return False
 
-    sample_processor = SampleProcessorUseCase(extraction_identifier)
-    samples = sample_processor.get_prediction_samples_for_suggestions()
+    sample_processor = get_sample_processor(extraction_identifier)
     extractor_job = extractor_job.set_extractors_path(MODELS_DATA_PATH)
-    suggestions = predict_use_case.predict(extractor_job, samples)
+    success = _predict_in_chunks(extractor_job, extraction_identifier, sample_processor)
     extraction_identifier.clean_extractor_folder(extractor_job.method_name)
-    return _send_suggestions(extraction_identifier, suggestions)[0]
+    return success
+
+
+def _predict_in_chunks(
+    extractor_job: TrainableEntityExtractorJob,
+    extraction_identifier: ExtractionIdentifier,
+    sample_processor: SampleProcessorUseCase,
+) -> bool:
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        samples = sample_processor.get_prediction_samples_page(PREDICTION_SAMPLES_CHUNK_SIZE)
+        if not samples:
+            config_logger.info(
+                f"No prediction samples for {extraction_identifier.run_name}/{extraction_identifier.extraction_name}"
+            )
+            return True
+
+        sending_suggestions = None
+        while True:
+            next_samples = None
+            if len(samples) == PREDICTION_SAMPLES_CHUNK_SIZE:
+                next_samples = executor.submit(sample_processor.get_prediction_samples_page, PREDICTION_SAMPLES_CHUNK_SIZE)
+
+            suggestions = predict_use_case.predict(extractor_job, samples)
+
+            if sending_suggestions and not sending_suggestions.result()[0]:
+                return False
+            sending_suggestions = executor.submit(_send_suggestions, extraction_identifier, suggestions)
+
+            samples = next_samples.result() if next_samples else None
+            if not samples:
+                return sending_suggestions.result()[0]
 
 
 def _send_suggestions(extraction_identifier: ExtractionIdentifier, suggestions: list[Suggestion]) -> tuple[bool, str]:
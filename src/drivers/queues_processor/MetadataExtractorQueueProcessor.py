@@ -20,6 +20,7 @@ from trainable_entity_extractor.use_cases.OrchestratorUseCase import Orchestrato
 from adapters.MongoPersistenceRepository import MongoPersistenceRepository
 from adapters.CeleryJobExecutor import CeleryJobExecutor
 from adapters.CloudModelStorage import CloudModelStorage
+from adapters.XmlHashSidecar import XmlHashSidecar
 from config import SERVICE_HOST, SERVICE_PORT, MODELS_DATA_PATH
 from domain.ParagraphExtractionResultsMessage import ParagraphExtractionResultsMessage
 from domain.ParagraphExtractorTask import ParagraphExtractorTask
@@ -28,8 +29,10 @@ from domain.TasksNames import TasksNames
 from domain.TaskType import TaskType
 from domain.TrainableEntityExtractionTask import TrainableEntityExtractionTask
 from drivers.extractors import EXTRACTORS
+from drivers.samples_codecs import SAMPLES_CODECS
 from use_cases.GetPerformanceJobUseCase import GetPerformanceJobUseCase
 from use_cases.ParagraphExtractorUseCase import ParagraphExtractorUseCase
+from use_cases.SampleProcessorUseCase import SampleProcessorUseCase
 from drivers.queues_processor.PredictionResultBuilder import PredictionResultBuilder
 from drivers.queues_processor.TrainingResultBuilder import TrainingResultBuilder
 
@@ -143,8 +146,9 @@ class MetadataExtractorQueueProcessor(QueueProcess):
     def _handle_create_model_task(
         self, task: TrainableEntityExtractionTask, extraction_identifier: ExtractionIdentifier, queue_name: str
     ):
+        sample_processor = SampleProcessorUseCase(extraction_identifier, SAMPLES_CODECS, XmlHashSidecar())
         get_performance_job_use_case = GetPerformanceJobUseCase(
-            extraction_identifier, task.params.options, task.params.multi_value
+            extraction_identifier, sample_processor, task.params.options, task.params.multi_value
         )
         distributed_job = get_performance_job_use_case.get_distributed_job(queue_name, EXTRACTORS, self.logger)
         methods_names = [sub_job.extractor_job.method_name for sub_job in distributed_job.sub_jobs]
@@ -0,0 +1,33 @@
+from collections import deque
+
+LATENCY_WINDOW_SIZE = 1000
+
+
+class EndpointsLatency:
+    def __init__(self, window_size: int = LATENCY_WINDOW_SIZE):
+        self.window_size = window_size
+        self.latencies: dict[str, deque[float]] = dict()
+        self.counts: dict[str, int] = dict()
+
+    def record(self, endpoint: str, seconds: float):
+        self.latencies.setdefault(endpoint, deque(maxlen=self.window_size)).append(seconds)
+        self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+
+    @staticmethod
+    def percentile(sorted_latencies: list[float], percentile: float) -> float:
+        index = min(len(sorted_latencies) - 1, int(round(percentile / 100 * (len(sorted_latencies) - 1))))
+        return sorted_latencies[index]
+
+    def get_statistics(self) -> dict[str, dict[str, float]]:
+        statistics = dict()
+        for endpoint, latencies in self.latencies.items():
+            sorted_latencies = sorted(latencies)
+            statistics[endpoint] = {
+                "count": self.counts[endpoint],
+                "mean_ms": round(1000 * sum(sorted_latencies) / len(sorted_latencies), 3),
+                "p50_ms": round(1000 * self.percentile(sorted_latencies, 50), 3),
+                "p95_ms": round(1000 * self.percentile(sorted_latencies, 95), 3),
+                "p99_ms": round(1000 * self.percentile(sorted_latencies, 99), 3),
+                "max_ms": round(1000 * sorted_latencies[-1], 3),
+            }
+        return statistics
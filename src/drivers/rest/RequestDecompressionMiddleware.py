@@ -0,0 +1,147 @@
+import itertools
+import zlib
+from typing import Iterator, Optional
+
+import zstandard
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from config import MAX_DECOMPRESSED_REQUEST_SIZE
+
+DECOMPRESSION_OUTPUT_SIZE = 128 * 1024
+# python-zstandard has no output limit per call and a few input bytes can inflate to a 128 KiB block,
+# so input is fed in small slices to keep what is inflated at once to a few MiB
+ZSTD_INPUT_SIZE = 256
+
+
+class DecompressedBody:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+
+    def count(self, data: bytes) -> bytes:
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise HTTPException(status_code=413, detail="Decompressed request body is too large")
+        return data
+
+
+class GzipBodyDecompressor:
+    def __init__(self):
+        self.decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        self.received_data = False
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        self.received_data = self.received_data or bool(data)
+        while data:
+            yield self.decompressor.decompress(data, DECOMPRESSION_OUTPUT_SIZE)
+            data = self.decompressor.unconsumed_tail
+
+    def flush(self) -> Iterator[bytes]:
+        yield self.decompressor.flush()
+        if self.received_data and not self.decompressor.eof:
+            raise HTTPException(status_code=400, detail="Truncated gzip request body")
+
+
+class ZstdBodyDecompressor:
+    def __init__(self):
+        self.decompressor = self.get_frame_decompressor()
+        self.frame_started = False
+
+    @staticmethod
+    def get_frame_decompressor():
+        return zstandard.ZstdDecompressor().decompressobj(write_size=DECOMPRESSION_OUTPUT_SIZE)
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        for offset in range(0, len(data), ZSTD_INPUT_SIZE):
+            data_slice = data[offset : offset + ZSTD_INPUT_SIZE]
+            while data_slice:
+                if self.decompressor.eof:
+                    self.decompressor = self.get_frame_decompressor()
+                self.frame_started = True
+                output = self.decompressor.decompress(data_slice)
+                for output_offset in range(0, len(output), DECOMPRESSION_OUTPUT_SIZE):
+                    yield output[output_offset : output_offset + DECOMPRESSION_OUTPUT_SIZE]
+                data_slice = self.decompressor.unused_data if self.decompressor.eof else b""
+
+    def flush(self) -> Iterator[bytes]:
+        if self.frame_started and not self.decompressor.eof:
+            raise HTTPException(status_code=400, detail="Truncated zstd request body")
+        yield from ()
+
+
+DECOMPRESSORS = {"gzip": GzipBodyDecompressor, "x-gzip": GzipBodyDecompressor, "zstd": ZstdBodyDecompressor}
+
+
+class RequestDecompressionMiddleware:
+    def __init__(self, app, max_size: int = MAX_DECOMPRESSED_REQUEST_SIZE):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = [(name, value) for name, value in scope["headers"]]
+        content_encoding = dict(headers).get(b"content-encoding", b"identity").decode("latin-1").strip().lower()
+        if content_encoding == "identity":
+            return await self.app(scope, receive, send)
+
+        if content_encoding not in DECOMPRESSORS:
+            response = JSONResponse({"detail": f"Unsupported Content-Encoding {content_encoding}"}, status_code=415)
+            return await response(scope, receive, send)
+
+        decompressed_body = DecompressedBody(self.max_size)
+        decompressor = DECOMPRESSORS[content_encoding]()
+        scope = dict(scope)
+        scope["headers"] = [(name, value) for name, value in headers if name not in (b"content-encoding", b"content-length")]
+        response_started = False
+        pieces: Iterator[bytes] = iter(())
+        received_whole_body = False
+        sent_whole_body = False
+
+        def next_piece() -> Optional[bytes]:
+            try:
+                return next(pieces, None)
+            except HTTPException:
+                raise
+            except (zlib.error, zstandard.ZstdError):
+                raise HTTPException(status_code=400, detail=f"Invalid {content_encoding} request body")
+
+        async def receive_decompressed():
+            nonlocal pieces, received_whole_body, sent_whole_body
+            if sent_whole_body:
+                return await receive()
+
+            while True:
+                piece = next_piece()
+                if piece:
+                    return {"type": "http.request", "body": decompressed_body.count(piece), "more_body": True}
+                if piece is not None:
+                    continue
+
+                if received_whole_body:
+                    sent_whole_body = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+
+                message = await receive()
+                if message["type"] != "http.request":
+                    return message
+
+                received_whole_body = not message.get("more_body", False)
+                pieces = decompressor.decompress(message.get("body", b""))
+                if received_whole_body:
+                    pieces = itertools.chain(pieces, decompressor.flush())
+
+        async def send_tracking_start(message):
+            nonlocal response_started
+            response_started = response_started or message["type"] == "http.response.start"
+            await send(message)
+
+        try:
+            await self.app(scope, receive_decompressed, send_tracking_start)
+        except HTTPException as exception:
+            if response_started:
+                raise
+            response = JSONResponse({"detail": exception.detail}, status_code=exception.status_code)
+            await response(scope, receive, send)
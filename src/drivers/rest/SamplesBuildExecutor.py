@@ -0,0 +1,62 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable
+
+from fastapi import HTTPException
+
+from config import SAMPLES_BUILD_WORKERS, SAMPLES_BUILD_QUEUE_SIZE
+
+
+class SamplesBuildExecutor:
+    def __init__(
+        self,
+        max_workers: int = SAMPLES_BUILD_WORKERS,
+        max_queued: int = SAMPLES_BUILD_QUEUE_SIZE,
+        thread_name_prefix: str = "samples_build",
+        niceness: int = 0,
+    ):
+        self.niceness = niceness
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix, initializer=self.lower_thread_priority
+        )
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queued
+        self.pending = 0
+
+    def lower_thread_priority(self):
+        if self.niceness and hasattr(os, "setpriority"):
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.niceness)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def try_acquire(self):
+        if self.pending >= self.max_pending:
+            raise HTTPException(status_code=503, detail="Too many samples being built", headers={"Retry-After": "5"})
+
+        self.pending += 1
+
+    def release(self):
+        self.pending -= 1
+
+    @contextmanager
+    def reserve(self):
+        self.try_acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def run_reserved(self, function: Callable, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    async def run(self, function: Callable, *args, **kwargs):
+        with self.reserve():
+            return await self.run_reserved(function, *args, **kwargs)
+
+    def get_statistics(self) -> dict[str, int]:
+        return {"workers": self.max_workers, "pending": self.pending, "max_pending": self.max_pending}
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException
+from trainable_entity_extractor.config import config_logger
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.LabeledData import LabeledData
+
+from adapters.XmlHashSidecar import XmlHashSidecar
+from config import SAMPLES_WARMING_DELAY, SAMPLES_WARMING_TTL, SAMPLES_WARMING_MAX_EXTRACTORS
+from drivers.rest.SamplesBuildExecutor import SamplesBuildExecutor
+from drivers.samples_codecs import SAMPLES_CODECS
+from use_cases.SampleProcessorUseCase import SampleProcessorUseCase
+
+
+class TrainingSamplesWarmer:
+    def __init__(
+        self,
+        warming_executor: SamplesBuildExecutor,
+        delay: float = SAMPLES_WARMING_DELAY,
+        ttl: float = SAMPLES_WARMING_TTL,
+        max_extractors: int = SAMPLES_WARMING_MAX_EXTRACTORS,
+    ):
+        self.warming_executor = warming_executor
+        self.delay = delay
+        self.ttl = ttl
+        self.max_extractors = max_extractors
+        self.labeled_data: dict[tuple[str, str], dict[str, LabeledData]] = dict()
+        self.xml_files_names: dict[tuple[str, str], set[str]] = dict()
+        self.tasks: dict[tuple[str, str], asyncio.Task] = dict()
+        self.updated_at: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self.evicted = 0
+
+    @staticmethod
+    def get_key(extraction_identifier: ExtractionIdentifier) -> tuple[str, str]:
+        return extraction_identifier.run_name, extraction_identifier.extraction_name
+
+    def labeled_data_arrived(self, extraction_identifier: ExtractionIdentifier, labeled_data_list: list[LabeledData]):
+        key = self.get_key(extraction_identifier)
+        self.touch(key)
+        extractor_labeled_data = self.labeled_data.setdefault(key, dict())
+        for labeled_data in labeled_data_list:
+            extractor_labeled_data[labeled_data.xml_file_name] = labeled_data
+        self.schedule(extraction_identifier)
+
+    def xml_arrived(self, extraction_identifier: ExtractionIdentifier, xml_file_name: str):
+        key = self.get_key(extraction_identifier)
+        self.touch(key)
+        self.xml_files_names.setdefault(key, set()).add(xml_file_name)
+        self.schedule(extraction_identifier)
+
+    def touch(self, key: tuple[str, str]):
+        self.updated_at[key] = time.monotonic()
+        self.updated_at.move_to_end(key)
+        self.evict()
+
+    def evict(self):
+        expiration_time = time.monotonic() - self.ttl
+        while self.updated_at:
+            key, updated_at = next(iter(self.updated_at.items()))
+            if updated_at > expiration_time and len(self.updated_at) <= self.max_extractors:
+                break
+            self.forget_key(key)
+            self.evicted += 1
+
+    def schedule(self, extraction_identifier: ExtractionIdentifier):
+        key = self.get_key(extraction_identifier)
+        if key in self.tasks and not self.tasks[key].done():
+            self.tasks[key].cancel()
+        self.tasks[key] = asyncio.create_task(self.warm(extraction_identifier))
+
+    def pop_ready_labeled_data(self, key: tuple[str, str]) -> list[LabeledData]:
+        extractor_labeled_data = self.labeled_data.get(key, dict())
+        xml_files_names = self.xml_files_names.get(key, set())
+        ready_names = [name for name in extractor_labeled_data if name in xml_files_names]
+        for name in ready_names:
+            xml_files_names.discard(name)
+        return [extractor_labeled_data.pop(name) for name in ready_names]
+
+    async def warm(self, extraction_identifier: ExtractionIdentifier):
+        await asyncio.sleep(self.delay)
+        key = self.get_key(extraction_identifier)
+        ready_labeled_data = self.pop_ready_labeled_data(key)
+        try:
+            if ready_labeled_data:
+                # Parse on the low priority warming thread, the shared parsing pool runs at normal priority
+                sample_processor = SampleProcessorUseCase(
+                    extraction_identifier, SAMPLES_CODECS, XmlHashSidecar(), parallel_parsing=False
+                )
+                await self.warming_executor.run(sample_processor.warm_pdf_data_cache, ready_labeled_data)
+                config_logger.info(f"Prebuilt {len(ready_labeled_data)} training documents for {key[0]}/{key[1]}")
+        except HTTPException:
+            config_logger.info(f"Skipped prebuilding training documents for {key[0]}/{key[1]}, warming queue is full")
+        except Exception:
+            config_logger.error(f"Error prebuilding training documents for {key[0]}/{key[1]}", exc_info=True)
+        finally:
+            if self.tasks.get(key) is asyncio.current_task():
+                del self.tasks[key]
+
+    def forget(self, extraction_identifier: ExtractionIdentifier):
+        self.forget_key(self.get_key(extraction_identifier))
+
+    def forget_key(self, key: tuple[str, str]):
+        task = self.tasks.pop(key, None)
+        if task and not task.done():
+            task.cancel()
+        self.labeled_data.pop(key, None)
+        self.xml_files_names.pop(key, None)
+        self.updated_at.pop(key, None)
+
+    def close(self):
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks.clear()
+
+    def get_statistics(self) -> dict[str, int]:
+        return {
+            "extractors": len(self.updated_at),
+            "warming_tasks": len(self.tasks),
+            "evicted_extractors": self.evicted,
+            "pending_labeled_data": sum(len(x) for x in self.labeled_data.values()),
+            "pending_xml_files": sum(len(x) for x in self.xml_files_names.values()),
+            "warming_executor_pending": self.warming_executor.pending,
+        }
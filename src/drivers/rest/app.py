@@ -1,46 +1,131 @@
+import asyncio
 import os
 import shutil
+import threading
+import time
 from contextlib import asynccontextmanager
 import json
-import redis
+from pathlib import Path
+
+from redis import asyncio as async_redis
 from ml_cloud_connector.adapters.google_v2.GoogleCloudStorage import GoogleCloudStorage
 from ml_cloud_connector.domain.ServerParameters import ServerParameters
 from ml_cloud_connector.domain.ServerType import ServerType
 from queue_processor.QueueProcessor import QueueProcessor
 from trainable_entity_extractor.adapters.ExtractorLogger import ExtractorLogger
 from trainable_entity_extractor.domain.Suggestion import Suggestion
+from trainable_entity_extractor.domain.TrainingSample import TrainingSample
 from trainable_entity_extractor.domain.XmlFile import XmlFile
 
+from adapters.AsyncMongoPersistenceRepository import AsyncMongoPersistenceRepository
 from adapters.MongoPersistenceRepository import MongoPersistenceRepository
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from adapters.XmlBlobStore import XmlBlobStore
+from adapters.XmlHashSidecar import XmlHashSidecar
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, Response
 import sys
 
 from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
 import sentry_sdk
+from pydantic import BaseModel
 from trainable_entity_extractor.config import config_logger
 from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
 from trainable_entity_extractor.domain.LabeledData import LabeledData
 from trainable_entity_extractor.domain.PredictionData import PredictionData
 
-from config import MODELS_DATA_PATH, REDIS_HOST, REDIS_PORT, PARAGRAPH_EXTRACTION_NAME, NAME
+from config import (
+    MODELS_DATA_PATH,
+    REDIS_HOST,
+    REDIS_PORT,
+    PARAGRAPH_EXTRACTION_NAME,
+    NAME,
+    SUGGESTIONS_PAGE_SIZE,
+    SAMPLES_CACHE_CLEANUP_INTERVAL,
+    XML_DEDUPLICATION,
+    SAMPLES_WARMING_WORKERS,
+    SAMPLES_WARMING_QUEUE_SIZE,
+    SAMPLES_WARMING_NICENESS,
+)
 from domain.ParagraphExtractionData import ParagraphExtractionData
 from domain.ParagraphExtractorTask import ParagraphExtractorTask
 from domain.XML import XML
+from domain.XmlHashReference import XmlHashReference
+from drivers.rest.EndpointsLatency import EndpointsLatency
 from drivers.rest.ParagraphsTranslations import ParagraphsTranslations
+from drivers.rest.RequestDecompressionMiddleware import RequestDecompressionMiddleware
+from drivers.rest.SamplesBuildExecutor import SamplesBuildExecutor
+from drivers.rest.TrainingSamplesWarmer import TrainingSamplesWarmer
 from drivers.rest.catch_exceptions import catch_exceptions
+from drivers.rest.content_negotiation import accepts_samples_codec, get_accepted_samples_codec
+from drivers.samples_codecs import SAMPLES_CODECS
+from ports.SamplesCodec import SamplesCodec
+from use_cases.PdfDataCacheUseCase import PdfDataCacheUseCase
 from use_cases.SampleProcessorUseCase import SampleProcessorUseCase
 from use_cases.SamplesCacheUseCase import SamplesCacheUseCase
+from use_cases.XmlUploadUseCase import XmlUploadUseCase
+
+
+def get_sample_processor(extraction_identifier: ExtractionIdentifier) -> SampleProcessorUseCase:
+    return SampleProcessorUseCase(extraction_identifier, SAMPLES_CODECS, XmlHashSidecar())
+
+
+def get_xml_upload(xml_file: XmlFile) -> XmlUploadUseCase:
+    xml_blob_store = XmlBlobStore(xml_file.extraction_identifier.run_name) if XML_DEDUPLICATION else None
+    return XmlUploadUseCase(xml_file, XmlHashSidecar(), xml_blob_store)
+
+
+async def clean_samples_cache_periodically():
+    while True:
+        try:
+            await run_in_threadpool(SamplesCacheUseCase(SAMPLES_CODECS).cleanup)
+            await run_in_threadpool(PdfDataCacheUseCase(SAMPLES_CODECS[0], XmlHashSidecar()).cleanup)
+            await run_in_threadpool(XmlBlobStore().cleanup)
+        except Exception:
+            config_logger.error("Error cleaning samples cache", exc_info=True)
+        await asyncio.sleep(SAMPLES_CACHE_CLEANUP_INTERVAL)
+
+
+def create_persistence_indexes():
+    persistence_repository = MongoPersistenceRepository()
+    try:
+        persistence_repository.create_indexes()
+    except Exception:
+        config_logger.error("Error creating persistence indexes", exc_info=True)
+    finally:
+        persistence_repository.close()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.persistence_repository = MongoPersistenceRepository()
+    app.persistence_repository = AsyncMongoPersistenceRepository()
+    threading.Thread(target=create_persistence_indexes, daemon=True).start()
     app.logger = ExtractorLogger()
+    app.redis = async_redis.Redis.from_pool(
+        async_redis.ConnectionPool(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+    )
+    app.queue_processors = dict()
+    app.training_samples_builds = dict()
+    app.samples_build_executor = SamplesBuildExecutor()
+    app.samples_warming_executor = SamplesBuildExecutor(
+        SAMPLES_WARMING_WORKERS, SAMPLES_WARMING_QUEUE_SIZE, "samples_warming", SAMPLES_WARMING_NICENESS
+    )
+    app.training_samples_warmer = TrainingSamplesWarmer(app.samples_warming_executor)
+    samples_cache_janitor = asyncio.create_task(clean_samples_cache_periodically())
     yield
+    samples_cache_janitor.cancel()
+    app.training_samples_warmer.close()
+    app.samples_build_executor.close()
+    app.samples_warming_executor.close()
+    await app.redis.aclose()
     app.persistence_repository.close()
 
 
 app = FastAPI(lifespan=lifespan)
+app.endpoints_latency = EndpointsLatency()
+app.add_middleware(RequestDecompressionMiddleware)
+
+STREAM_CHUNK_SIZE = 1024 * 1024
 
 config_logger.info("PDF information extraction service has started")
 
@@ -55,6 +140,21 @@ except Exception:
     pass
 
 
+@app.middleware("http")
+async def record_endpoint_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    if route := request.scope.get("route"):
+        app.endpoints_latency.record(f"{request.method} {route.path}", time.perf_counter() - start)
+    return response
+
+
+def get_queue_processor(queue_name: str) -> QueueProcessor:
+    if queue_name not in app.queue_processors:
+        app.queue_processors[queue_name] = QueueProcessor(REDIS_HOST, REDIS_PORT, [queue_name])
+    return app.queue_processors[queue_name]
+
+
 @app.get("/")
 @app.get("/info")
 async def info():
@@ -72,14 +172,12 @@ async def error():
 @catch_exceptions
 async def to_train_xml_file(tenant, extraction_id, file: UploadFile = File(...)):
     filename = file.filename
-    xml_file = XmlFile(
-        extraction_identifier=ExtractionIdentifier(
-            run_name=tenant, extraction_name=extraction_id, output_path=MODELS_DATA_PATH
-        ),
-        to_train=True,
-        xml_file_name=filename,
+    extraction_identifier = ExtractionIdentifier(
+        run_name=tenant, extraction_name=extraction_id, output_path=MODELS_DATA_PATH
     )
-    xml_file.save(file_content=file.file.read())
+    xml_file = XmlFile(extraction_identifier=extraction_identifier, to_train=True, xml_file_name=filename)
+    await run_in_threadpool(get_xml_upload(xml_file).save, file.file)
+    app.training_samples_warmer.xml_arrived(extraction_identifier, filename)
     return "xml_to_train saved"
 
 
@@ -94,10 +192,46 @@ async def to_predict_xml_file(tenant, extraction_id, file: UploadFile = File(...
         to_train=False,
         xml_file_name=filename,
     )
-    xml_file.save(file_content=file.file.read())
+    await run_in_threadpool(get_xml_upload(xml_file).save, file.file)
+    return "xml_to_train saved"
+
+
+@app.post("/xml_missing_hashes/{tenant}")
+@catch_exceptions
+async def xml_missing_hashes(tenant: str, xml_hashes: list[str]) -> list[str]:
+    return await run_in_threadpool(XmlBlobStore(tenant).get_missing_hashes, xml_hashes)
+
+
+async def attach_xml_by_hash(tenant: str, extraction_id: str, to_train: bool, xml_hash_reference: XmlHashReference):
+    xml_file_name = xml_hash_reference.xml_file_name
+    if Path(xml_file_name).name != xml_file_name or not XmlBlobStore.is_valid_hash(xml_hash_reference.xml_hash):
+        raise HTTPException(status_code=422, detail="Invalid XML file name or hash")
+
+    extraction_identifier = ExtractionIdentifier(
+        run_name=tenant, extraction_name=extraction_id, output_path=MODELS_DATA_PATH
+    )
+    xml_file = XmlFile(extraction_identifier=extraction_identifier, to_train=to_train, xml_file_name=xml_file_name)
+    if not await run_in_threadpool(get_xml_upload(xml_file).attach, xml_hash_reference.xml_hash):
+        raise HTTPException(status_code=404, detail="XML not stored, upload the file")
+
+    if to_train:
+        app.training_samples_warmer.xml_arrived(extraction_identifier, xml_file_name)
+
+
+@app.post("/xml_to_train_by_hash/{tenant}/{extraction_id}")
+@catch_exceptions
+async def to_train_xml_by_hash(tenant: str, extraction_id: str, xml_hash_reference: XmlHashReference):
+    await attach_xml_by_hash(tenant, extraction_id, True, xml_hash_reference)
     return "xml_to_train saved"
 
 
+@app.post("/xml_to_predict_by_hash/{tenant}/{extraction_id}")
+@catch_exceptions
+async def to_predict_xml_by_hash(tenant: str, extraction_id: str, xml_hash_reference: XmlHashReference):
+    await attach_xml_by_hash(tenant, extraction_id, False, xml_hash_reference)
+    return "xml_to_predict saved"
+
+
 @app.post("/labeled_data")
 @catch_exceptions
 async def labeled_data_post(labeled_data: LabeledData):
@@ -105,10 +239,11 @@ async def labeled_data_post(labeled_data: LabeledData):
     extraction_identifier = ExtractionIdentifier(
         run_name=labeled_data.tenant, extraction_name=labeled_data.id, output_path=MODELS_DATA_PATH
     )
-    app.persistence_repository.save_labeled_data(extraction_identifier, labeled_data)
+    await app.persistence_repository.save_labeled_data(extraction_identifier, labeled_data)
+    app.training_samples_warmer.labeled_data_arrived(extraction_identifier, [labeled_data])
 
     try:
-        deleted = SampleProcessorUseCase(extraction_identifier).delete_cache()
+        deleted = get_sample_processor(extraction_identifier).delete_cache()
         if deleted:
             config_logger.info(f"Deleted training cache for {labeled_data.tenant}/{labeled_data.id}")
     except Exception:
@@ -117,39 +252,170 @@ async def labeled_data_post(labeled_data: LabeledData):
     return "labeled data saved"
 
 
+def group_by_extractor(
+    data_list: list[LabeledData] | list[PredictionData],
+) -> list[tuple[ExtractionIdentifier, list[LabeledData] | list[PredictionData]]]:
+    data_by_extractor: dict[tuple[str, str], list] = dict()
+    for data in data_list:
+        data_by_extractor.setdefault((data.tenant, data.id), list()).append(data)
+
+    return [
+        (ExtractionIdentifier(run_name=tenant, extraction_name=extraction_id, output_path=MODELS_DATA_PATH), extractor_data)
+        for (tenant, extraction_id), extractor_data in data_by_extractor.items()
+    ]
+
+
+@app.post("/labeled_data_list")
+@catch_exceptions
+async def labeled_data_list_post(labeled_data_list: list[LabeledData]):
+    for labeled_data in labeled_data_list:
+        labeled_data.scale_down_labels()
+
+    for extraction_identifier, extractor_labeled_data in group_by_extractor(labeled_data_list):
+        await app.persistence_repository.save_labeled_data_list(extraction_identifier, extractor_labeled_data)
+        app.training_samples_warmer.labeled_data_arrived(extraction_identifier, extractor_labeled_data)
+
+        try:
+            deleted = get_sample_processor(extraction_identifier).delete_cache()
+            if deleted:
+                config_logger.info(
+                    f"Deleted training cache for {extraction_identifier.run_name}/{extraction_identifier.extraction_name}"
+                )
+        except Exception:
+            pass
+
+    return f"{len(labeled_data_list)} labeled data saved"
+
+
+def stream_file(file_path: Path, media_type: str, content_encoding: str, offset: int = 0) -> StreamingResponse:
+    file = open(file_path, "rb")
+    file.seek(offset)
+    headers = {"Content-Encoding": content_encoding, "Content-Length": str(os.fstat(file.fileno()).st_size - offset)}
+
+    def read_chunks():
+        with file:
+            while chunk := file.read(STREAM_CHUNK_SIZE):
+                yield chunk
+
+    return StreamingResponse(read_chunks(), media_type=media_type, headers=headers)
+
+
+def encode_samples(samples: list[BaseModel] | list[dict], samples_codec: SamplesCodec = None) -> bytes:
+    samples_dicts = [x.model_dump(mode="json") if isinstance(x, BaseModel) else x for x in samples]
+    if not samples_codec:
+        return json.dumps(samples_dicts).encode("utf-8")
+
+    return samples_codec.encode(samples_dicts)
+
+
+async def samples_response(request: Request, samples: list[BaseModel] | list[dict]):
+    samples_codec = get_accepted_samples_codec(request)
+    content = await app.samples_build_executor.run_reserved(encode_samples, samples, samples_codec)
+    if not samples_codec:
+        return Response(content=content, media_type="application/json")
+
+    headers = {"Content-Encoding": samples_codec.content_encoding}
+    return Response(content=content, media_type=samples_codec.media_type, headers=headers)
+
+
 @app.get("/get_samples_training/{run_name}/{extraction_name}")
 @catch_exceptions
-async def get_samples_training(run_name: str, extraction_name: str):
+async def get_samples_training(run_name: str, extraction_name: str, request: Request):
     extraction_identifier = ExtractionIdentifier(
         run_name=run_name, extraction_name=extraction_name, output_path=MODELS_DATA_PATH
     )
-    samples_cache = SamplesCacheUseCase()
-    samples_cache.cleanup_expired_cache()
+    samples_cache = SamplesCacheUseCase(SAMPLES_CODECS)
     cache_key = samples_cache.get_training_cache_key(run_name, extraction_name)
-    cached_samples = samples_cache.get_cached_samples(cache_key)
 
-    if cached_samples is not None:
-        config_logger.info(f"Returning cached training samples from file for {run_name}/{extraction_name}")
-        return cached_samples
+    cache_file = samples_cache.get_valid_cache_file(cache_key)
+    if cache_file and accepts_samples_codec(request, cache_file[1]):
+        cache_file_path, samples_codec, payload_offset = cache_file
+        config_logger.info(f"Streaming compressed cached training samples for {run_name}/{extraction_name}")
+        return stream_file(cache_file_path, samples_codec.media_type, samples_codec.content_encoding, payload_offset)
+
+    with app.samples_build_executor.reserve():
+        cached_samples = (
+            await app.samples_build_executor.run_reserved(samples_cache.read_cache_file, cache_file) if cache_file else None
+        )
+
+        if cached_samples is not None:
+            config_logger.info(f"Returning cached training samples from file for {run_name}/{extraction_name}")
+            return await samples_response(request, cached_samples)
+
+        if cache_key in app.training_samples_builds:
+            config_logger.info(f"Waiting for training samples being built for {run_name}/{extraction_name}")
+            samples = await asyncio.shield(app.training_samples_builds[cache_key])
+        else:
+            samples = await build_training_samples(extraction_identifier, samples_cache, cache_key)
 
-    labeled_data = app.persistence_repository.load_and_delete_labeled_data(extraction_identifier)
-    samples = SampleProcessorUseCase(extraction_identifier).get_samples_for_training(labeled_data_list=labeled_data)
+        return await samples_response(request, samples)
 
-    samples_cache.cache_samples(cache_key, samples)
-    config_logger.info(f"Cached training samples to file for {run_name}/{extraction_name}")
 
-    return samples
+async def build_training_samples(
+    extraction_identifier: ExtractionIdentifier, samples_cache: SamplesCacheUseCase, cache_key: str
+) -> list[TrainingSample]:
+    build = asyncio.get_running_loop().create_future()
+    app.training_samples_builds[cache_key] = build
+    app.training_samples_warmer.forget(extraction_identifier)
+    try:
+        labeled_data = await app.persistence_repository.load_and_delete_labeled_data(extraction_identifier)
+        sample_processor = get_sample_processor(extraction_identifier)
+        samples = await app.samples_build_executor.run_reserved(sample_processor.get_samples_for_training, labeled_data)
+        await app.samples_build_executor.run_reserved(samples_cache.cache_samples, cache_key, samples)
+        config_logger.info(
+            f"Cached training samples to file for {extraction_identifier.run_name}/{extraction_identifier.extraction_name}"
+        )
+        build.set_result(samples)
+        return samples
+    except asyncio.CancelledError:
+        build.cancel()
+        raise
+    except Exception as exception:
+        build.set_exception(exception)
+        build.exception()
+        raise
+    finally:
+        app.training_samples_builds.pop(cache_key, None)
+
+
+@app.get("/samples_cache_statistics")
+async def samples_cache_statistics():
+    return await run_in_threadpool(SamplesCacheUseCase(SAMPLES_CODECS).get_statistics)
+
+
+@app.get("/endpoints_latency")
+async def endpoints_latency():
+    return {
+        "endpoints": app.endpoints_latency.get_statistics(),
+        "samples_build_executor": app.samples_build_executor.get_statistics(),
+        "training_samples_warmer": app.training_samples_warmer.get_statistics(),
+    }
+
+
+@app.get("/persistence_indexes_usage")
+@catch_exceptions
+async def persistence_indexes_usage():
+    return await app.persistence_repository.get_indexes_usage()
 
 
 @app.get("/get_samples_prediction/{run_name}/{extraction_name}")
 @catch_exceptions
-async def get_samples_prediction(run_name: str, extraction_name: str):
+async def get_samples_prediction(
+    run_name: str, extraction_name: str, request: Request, limit: int | None = Query(None, gt=0)
+):
     extraction_identifier = ExtractionIdentifier(
         run_name=run_name, extraction_name=extraction_name, output_path=MODELS_DATA_PATH
     )
-    prediction_data = app.persistence_repository.load_and_delete_prediction_data(extraction_identifier)
-    samples = SampleProcessorUseCase(extraction_identifier).get_prediction_samples(prediction_data_list=prediction_data)
-    return samples
+    with app.samples_build_executor.reserve():
+        if limit:
+            prediction_data = await app.persistence_repository.load_and_delete_prediction_data_page(
+                extraction_identifier, limit
+            )
+        else:
+            prediction_data = await app.persistence_repository.load_and_delete_prediction_data(extraction_identifier)
+        sample_processor = get_sample_processor(extraction_identifier)
+        samples = await app.samples_build_executor.run_reserved(sample_processor.get_prediction_samples, prediction_data)
+        return await samples_response(request, samples)
 
 
 @app.post("/prediction_data")
@@ -158,49 +424,75 @@ async def prediction_data_post(prediction_data: PredictionData):
     extraction_identifier = ExtractionIdentifier(
         run_name=prediction_data.tenant, extraction_name=prediction_data.id, output_path=MODELS_DATA_PATH
     )
-    app.persistence_repository.save_prediction_data(extraction_identifier, prediction_data)
+    await app.persistence_repository.save_prediction_data(extraction_identifier, prediction_data)
     return "prediction data saved"
 
 
+@app.post("/prediction_data_list")
+@catch_exceptions
+async def prediction_data_list_post(prediction_data_list: list[PredictionData]):
+    for extraction_identifier, extractor_prediction_data in group_by_extractor(prediction_data_list):
+        await app.persistence_repository.save_prediction_data_list(extraction_identifier, extractor_prediction_data)
+
+    return f"{len(prediction_data_list)} prediction data saved"
+
+
 @app.get("/get_suggestions/{run_name}/{extraction_name}")
 @catch_exceptions
 async def get_suggestions(run_name: str, extraction_name: str):
     extraction_identifier = ExtractionIdentifier(
         run_name=run_name, extraction_name=extraction_name, output_path=MODELS_DATA_PATH
     )
-    suggestions = app.persistence_repository.load_suggestions(extraction_identifier)
+    suggestions = await app.persistence_repository.load_suggestions(extraction_identifier)
     suggestions_list = [x.scale_up().to_output() for x in suggestions]
     app.logger.log(extraction_identifier, f"{len(suggestions_list)} suggestions queried")
 
     return json.dumps(suggestions_list)
 
 
+@app.get("/get_suggestions_page/{run_name}/{extraction_name}")
+@catch_exceptions
+async def get_suggestions_page(
+    run_name: str, extraction_name: str, after_id: str | None = None, page_size: int = Query(SUGGESTIONS_PAGE_SIZE, gt=0)
+):
+    extraction_identifier = ExtractionIdentifier(
+        run_name=run_name, extraction_name=extraction_name, output_path=MODELS_DATA_PATH
+    )
+    # after_id acknowledges every suggestion returned up to it, nothing is deleted before the client asks for more
+    if after_id:
+        await app.persistence_repository.delete_suggestions_up_to(extraction_identifier, after_id)
+
+    next_after_id, suggestions = await app.persistence_repository.load_suggestions_page(
+        extraction_identifier, after_id, page_size
+    )
+    app.logger.log(extraction_identifier, f"{len(suggestions)} suggestions paged")
+    return {"after_id": next_after_id, "suggestions": [x.scale_up().to_output() for x in suggestions]}
+
+
 @app.post("/save_suggestions/{run_name}/{extraction_name}")
 @catch_exceptions
 async def save_suggestions(run_name: str, extraction_name: str, suggestions: list[Suggestion]):
     extraction_identifier = ExtractionIdentifier(
         run_name=run_name, extraction_name=extraction_name, output_path=MODELS_DATA_PATH
     )
-    app.persistence_repository.save_suggestions(extraction_identifier, suggestions)
+    await app.persistence_repository.save_suggestions(extraction_identifier, suggestions)
     app.logger.log(extraction_identifier, f"{len(suggestions)} suggestions saved")
     return True
 
 
 @app.get("/is_extractor_cancelled/{run_name}/{extraction_name}")
 async def is_extractor_cancelled(run_name: str, extraction_name: str):
-    r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
     key = f"{NAME}_training:{run_name}:{extraction_name}:canceled"
-    cancelled_flag = r.get(key)
+    cancelled_flag = await app.redis.get(key)
     if cancelled_flag == "true":
-        r.delete(key)
+        await app.redis.delete(key)
     return {"cancelled": cancelled_flag == "true"}
 
 
 @app.post("/cancel_training/{run_name}/{extraction_name}")
 async def cancel_training(run_name: str, extraction_name: str):
     try:
-        r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
-        r.set(f"{NAME}_training:{run_name}:{extraction_name}:canceled", "true")
+        await app.redis.set(f"{NAME}_training:{run_name}:{extraction_name}:canceled", "true")
     except:
         return False
 
@@ -208,10 +500,10 @@ async def cancel_training(run_name: str, extraction_name: str):
         run_name=run_name, extraction_name=extraction_name, output_path=MODELS_DATA_PATH
     )
 
-    app.persistence_repository.load_and_delete_labeled_data(extraction_identifier)
+    await app.persistence_repository.load_and_delete_labeled_data(extraction_identifier)
 
     try:
-        samples_processor = SampleProcessorUseCase(extraction_identifier)
+        samples_processor = get_sample_processor(extraction_identifier)
         samples_processor.delete_cache()
     except Exception:
         pass
@@ -227,7 +519,7 @@ async def _delete_cache_logic(run_name: str, extraction_name: str) -> bool:
         shutil.rmtree(extraction_identifier.get_path(), ignore_errors=True)
         config_logger.info(f"Folder deleted for {run_name}/{extraction_name}")
 
-        samples_processor = SampleProcessorUseCase(extraction_identifier)
+        samples_processor = get_sample_processor(extraction_identifier)
         samples_processor.delete_cache()
         return True
     except Exception as e:
@@ -247,14 +539,15 @@ async def delete_extractor(run_name: str, extraction_name: str):
     )
 
     await _delete_cache_logic(run_name, extraction_name)
+    app.training_samples_warmer.forget(extraction_identifier)
 
     try:
-        app.persistence_repository.load_and_delete_labeled_data(extraction_identifier)
+        await app.persistence_repository.load_and_delete_labeled_data(extraction_identifier)
     except Exception as e:
         config_logger.error(f"Error deleting labeled data for {run_name}/{extraction_name}: {e}")
 
     try:
-        app.persistence_repository.load_and_delete_prediction_data(extraction_identifier)
+        await app.persistence_repository.load_and_delete_prediction_data(extraction_identifier)
     except Exception as e:
         config_logger.error(f"Error deleting prediction data for {run_name}/{extraction_name}: {e}")
 
@@ -285,7 +578,7 @@ async def extract_paragraphs(json_data: str = Form(...), xml_files: list[UploadF
     )
 
     config_logger.info(f"extract_paragraphs endpoint called for {extractor_identifier.extraction_name}")
-    app.persistence_repository.save_paragraph_extraction_data(extractor_identifier, paragraph_extraction_data)
+    await app.persistence_repository.save_paragraph_extraction_data(extractor_identifier, paragraph_extraction_data)
 
     for file in xml_files:
         xml_file = XmlFile(
@@ -293,7 +586,7 @@ async def extract_paragraphs(json_data: str = Form(...), xml_files: list[UploadF
             to_train=True,
             xml_file_name=file.filename,
         )
-        xml_file.save(file_content=file.file.read())
+        await run_in_threadpool(XmlUploadUseCase(xml_file).save, file.file)
 
     paragraph_extractor_task = ParagraphExtractorTask(
         task=PARAGRAPH_EXTRACTION_NAME,
@@ -304,7 +597,7 @@ async def extract_paragraphs(json_data: str = Form(...), xml_files: list[UploadF
 
     task = paragraph_extractor_task.model_dump()
     queue_name = paragraph_extraction_data.queue_name if paragraph_extraction_data.queue_name else PARAGRAPH_EXTRACTION_NAME
-    QueueProcessor(REDIS_HOST, REDIS_PORT, [queue_name]).send_message(task)
+    await run_in_threadpool(get_queue_processor(queue_name).send_message, task)
     return "ok"
 
 
@@ -314,7 +607,7 @@ async def get_paragraphs_translations(key: str) -> ParagraphsTranslations:
     extractor_identifier = ExtractionIdentifier(
         run_name=PARAGRAPH_EXTRACTION_NAME, extraction_name=key, output_path=MODELS_DATA_PATH
     )
-    paragraphs_from_languages = app.persistence_repository.load_paragraphs_from_languages(extractor_identifier)
+    paragraphs_from_languages = await app.persistence_repository.load_paragraphs_from_languages(extractor_identifier)
     if paragraphs_from_languages and paragraphs_from_languages[0].paragraphs:
         message = f"Getting {len(paragraphs_from_languages[0].paragraphs)} paragraphs"
         message += f" in {len(paragraphs_from_languages)} languages"
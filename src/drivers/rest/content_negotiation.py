@@ -0,0 +1,56 @@
+from typing import Optional
+
+from fastapi import Request
+
+from drivers.samples_codecs import SAMPLES_CODECS
+from ports.SamplesCodec import SamplesCodec
+
+
+def get_accepted_values(header_value: str) -> dict[str, float]:
+    accepted_values: dict[str, float] = dict()
+    for accepted_value in header_value.split(","):
+        name, _, parameters = accepted_value.partition(";")
+        if not name.strip():
+            continue
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            key, _, value = parameter.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted_values[name.strip().lower()] = quality
+
+    return accepted_values
+
+
+def accepts_encoding(request: Request, encoding: str) -> bool:
+    accepted_encodings = get_accepted_values(request.headers.get("accept-encoding", ""))
+    return accepted_encodings.get(encoding, accepted_encodings.get("*", 0)) > 0
+
+
+def accepts_media_type(request: Request, media_type: str, explicitly: bool = False) -> bool:
+    accepted_media_types = get_accepted_values(request.headers.get("accept", "*/*"))
+    if media_type in accepted_media_types or explicitly:
+        return accepted_media_types.get(media_type, 0) > 0
+
+    media_type_range = media_type.split("/")[0] + "/*"
+    return accepted_media_types.get(media_type_range, accepted_media_types.get("*/*", 0)) > 0
+
+
+def accepts_samples_codec(request: Request, samples_codec: SamplesCodec) -> bool:
+    explicitly = samples_codec.media_type != "application/json"
+    return accepts_media_type(request, samples_codec.media_type, explicitly) and accepts_encoding(
+        request, samples_codec.content_encoding
+    )
+
+
+def get_accepted_samples_codec(request: Request) -> Optional[SamplesCodec]:
+    for samples_codec in SAMPLES_CODECS:
+        if accepts_media_type(request, samples_codec.media_type, explicitly=True) and accepts_encoding(
+            request, samples_codec.content_encoding
+        ):
+            return samples_codec
+
+    return None
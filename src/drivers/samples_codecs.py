@@ -0,0 +1,10 @@
+from adapters.GzipJsonSamplesCodec import GzipJsonSamplesCodec
+from adapters.GzipMsgpackSamplesCodec import GzipMsgpackSamplesCodec
+from adapters.ZstdMsgpackSamplesCodec import ZstdMsgpackSamplesCodec
+from ports.SamplesCodec import SamplesCodec
+
+SAMPLES_CODECS: list[SamplesCodec] = [
+    ZstdMsgpackSamplesCodec(),
+    GzipMsgpackSamplesCodec(),
+    GzipJsonSamplesCodec(),
+]
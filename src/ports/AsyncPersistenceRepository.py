@@ -0,0 +1,85 @@
+from abc import abstractmethod, ABC
+from typing import Any, Optional
+
+from multilingual_paragraph_extractor.domain.ParagraphsFromLanguage import ParagraphsFromLanguage
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.LabeledData import LabeledData
+from trainable_entity_extractor.domain.PredictionData import PredictionData
+from trainable_entity_extractor.domain.Suggestion import Suggestion
+
+from domain.ParagraphExtractionData import ParagraphExtractionData
+
+
+class AsyncPersistenceRepository(ABC):
+
+    @abstractmethod
+    def close(self):
+        pass
+
+    @abstractmethod
+    async def get_indexes_usage(self) -> dict[str, list[dict[str, Any]]]:
+        pass
+
+    @abstractmethod
+    async def save_prediction_data(self, extraction_identifier: ExtractionIdentifier, prediction_data: PredictionData):
+        pass
+
+    @abstractmethod
+    async def save_prediction_data_list(
+        self, extraction_identifier: ExtractionIdentifier, prediction_data_list: list[PredictionData]
+    ):
+        pass
+
+    @abstractmethod
+    async def load_and_delete_prediction_data(self, extraction_identifier: ExtractionIdentifier) -> list[PredictionData]:
+        pass
+
+    @abstractmethod
+    async def load_and_delete_prediction_data_page(
+        self, extraction_identifier: ExtractionIdentifier, limit: int
+    ) -> list[PredictionData]:
+        pass
+
+    @abstractmethod
+    async def save_labeled_data(self, extraction_identifier: ExtractionIdentifier, labeled_data: LabeledData):
+        pass
+
+    @abstractmethod
+    async def save_labeled_data_list(
+        self, extraction_identifier: ExtractionIdentifier, labeled_data_list: list[LabeledData]
+    ):
+        pass
+
+    @abstractmethod
+    async def load_and_delete_labeled_data(self, extraction_identifier: ExtractionIdentifier) -> list[LabeledData]:
+        pass
+
+    @abstractmethod
+    async def save_suggestions(self, extraction_identifier: ExtractionIdentifier, suggestions: list[Suggestion]):
+        pass
+
+    @abstractmethod
+    async def load_suggestions(self, extraction_identifier: ExtractionIdentifier) -> list[Suggestion]:
+        pass
+
+    @abstractmethod
+    async def load_suggestions_page(
+        self, extraction_identifier: ExtractionIdentifier, after_id: Optional[str], page_size: int
+    ) -> tuple[Optional[str], list[Suggestion]]:
+        pass
+
+    @abstractmethod
+    async def delete_suggestions_up_to(self, extraction_identifier: ExtractionIdentifier, after_id: str):
+        pass
+
+    @abstractmethod
+    async def save_paragraph_extraction_data(
+        self, extraction_identifier: ExtractionIdentifier, paragraph_extraction_data: ParagraphExtractionData
+    ):
+        pass
+
+    @abstractmethod
+    async def load_paragraphs_from_languages(
+        self, extraction_identifier: ExtractionIdentifier
+    ) -> list[ParagraphsFromLanguage]:
+        pass
@@ -1,4 +1,5 @@
 from abc import abstractmethod, ABC
+from typing import Any, Optional
 
 from multilingual_paragraph_extractor.domain.ParagraphsFromLanguage import ParagraphsFromLanguage
 from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
@@ -15,10 +16,24 @@ class PersistenceRepository(ABC):
     def close(self):
         pass
 
+    @abstractmethod
+    def create_indexes(self):
+        pass
+
+    @abstractmethod
+    def get_indexes_usage(self) -> dict[str, list[dict[str, Any]]]:
+        pass
+
     @abstractmethod
     def save_prediction_data(self, extraction_identifier: ExtractionIdentifier, prediction_data: PredictionData):
         pass
 
+    @abstractmethod
+    def save_prediction_data_list(
+        self, extraction_identifier: ExtractionIdentifier, prediction_data_list: list[PredictionData]
+    ):
+        pass
+
     @abstractmethod
     def load_prediction_data(self, extraction_identifier: ExtractionIdentifier) -> list[PredictionData]:
         pass
@@ -27,10 +42,20 @@ class PersistenceRepository(ABC):
     def load_and_delete_prediction_data(self, extraction_identifier: ExtractionIdentifier) -> list[PredictionData]:
         pass
 
+    @abstractmethod
+    def load_and_delete_prediction_data_page(
+        self, extraction_identifier: ExtractionIdentifier, limit: int
+    ) -> list[PredictionData]:
+        pass
+
     @abstractmethod
     def save_labeled_data(self, extraction_identifier: ExtractionIdentifier, labeled_data: LabeledData):
         pass
 
+    @abstractmethod
+    def save_labeled_data_list(self, extraction_identifier: ExtractionIdentifier, labeled_data_list: list[LabeledData]):
+        pass
+
     @abstractmethod
     def delete_labeled_data(self, extraction_identifier: ExtractionIdentifier):
         pass
@@ -51,6 +76,16 @@ class PersistenceRepository(ABC):
     def load_suggestions(self, extraction_identifier: ExtractionIdentifier) -> list[Suggestion]:
         pass
 
+    @abstractmethod
+    def load_suggestions_page(
+        self, extraction_identifier: ExtractionIdentifier, after_id: Optional[str], page_size: int
+    ) -> tuple[Optional[str], list[Suggestion]]:
+        pass
+
+    @abstractmethod
+    def delete_suggestions_up_to(self, extraction_identifier: ExtractionIdentifier, after_id: str):
+        pass
+
     @abstractmethod
     def save_paragraph_extraction_data(
         self, extraction_identifier: ExtractionIdentifier, paragraph_extraction_data: ParagraphExtractionData
@@ -0,0 +1,15 @@
+from abc import abstractmethod, ABC
+
+
+class SamplesCodec(ABC):
+    name: str
+    media_type: str
+    content_encoding: str
+
+    @abstractmethod
+    def encode(self, samples: list[dict]) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, content: bytes) -> list[dict]:
+        pass
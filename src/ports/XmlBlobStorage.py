@@ -0,0 +1,12 @@
+from abc import abstractmethod, ABC
+from pathlib import Path
+
+
+class XmlBlobStorage(ABC):
+    @abstractmethod
+    def save(self, temporary_path: str | Path, destination_path: str | Path, xml_hash: str):
+        pass
+
+    @abstractmethod
+    def attach(self, xml_hash: str, destination_path: str | Path) -> bool:
+        pass
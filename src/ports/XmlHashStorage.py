@@ -0,0 +1,18 @@
+from abc import abstractmethod, ABC
+from typing import Optional
+
+from trainable_entity_extractor.domain.XmlFile import XmlFile
+
+
+class XmlHashStorage(ABC):
+    @abstractmethod
+    def get_xml_hash(self, xml_file: XmlFile) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def save_xml_hash(self, xml_file: XmlFile, xml_hash: str):
+        pass
+
+    @abstractmethod
+    def delete(self, xml_file: XmlFile):
+        pass
@@ -0,0 +1,35 @@
+import os
+import shutil
+import time
+from unittest import TestCase
+
+from trainable_entity_extractor.domain.PdfData import PdfData
+
+from adapters.XmlHashSidecar import XmlHashSidecar
+from drivers.samples_codecs import SAMPLES_CODECS
+from use_cases.PdfDataCacheUseCase import PdfDataCacheUseCase
+
+
+class TestPdfDataCacheUseCase(TestCase):
+    run_name = "pdf_data_cache_test"
+
+    def setUp(self):
+        shutil.rmtree(PdfDataCacheUseCase(SAMPLES_CODECS[0], XmlHashSidecar()).root_dir, ignore_errors=True)
+
+    def tearDown(self):
+        shutil.rmtree(PdfDataCacheUseCase(SAMPLES_CODECS[0], XmlHashSidecar()).root_dir, ignore_errors=True)
+
+    def test_cleanup_evicts_least_recently_used_entries_over_the_byte_limit(self):
+        pdf_data_cache = PdfDataCacheUseCase(SAMPLES_CODECS[0], XmlHashSidecar(), self.run_name)
+        for index in range(3):
+            pdf_data_cache.save(f"key_{index}", PdfData.from_texts([f"text {index}" * 100]))
+            cache_file_path = pdf_data_cache.cache_dir / f"key_{index}.pdf_data"
+            os.utime(cache_file_path, (time.time() - 100 + index, cache_file_path.stat().st_mtime))
+
+        entry_size = (pdf_data_cache.cache_dir / "key_2.pdf_data").stat().st_size
+        pdf_data_cache.get("key_0")
+        PdfDataCacheUseCase(SAMPLES_CODECS[0], XmlHashSidecar(), max_bytes=2 * entry_size + 10).cleanup()
+
+        self.assertIsNotNone(pdf_data_cache.get("key_0"))
+        self.assertIsNone(pdf_data_cache.get("key_1"))
+        self.assertIsNotNone(pdf_data_cache.get("key_2"))
@@ -0,0 +1,101 @@
+import gzip
+import json
+from unittest import TestCase
+
+import zstandard
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from drivers.rest.RequestDecompressionMiddleware import RequestDecompressionMiddleware, DECOMPRESSION_OUTPUT_SIZE
+
+echo_app = FastAPI()
+echo_app.add_middleware(RequestDecompressionMiddleware, max_size=1024 * 1024)
+
+
+@echo_app.post("/echo")
+async def echo(request: Request):
+    body = await request.body()
+    return {"size": len(body), "content_length": request.headers.get("content-length"), "body": body.decode()}
+
+
+@echo_app.post("/chunks")
+async def chunks(request: Request):
+    chunks_sizes = [len(chunk) async for chunk in request.stream() if chunk]
+    return {"count": len(chunks_sizes), "max_size": max(chunks_sizes), "size": sum(chunks_sizes)}
+
+
+class TestRequestDecompressionMiddleware(TestCase):
+    content = json.dumps({"xml_segments_boxes": [{"left": 1, "top": 2}] * 1000}).encode()
+
+    def test_decompress_request_bodies(self):
+        compressed_bodies = {
+            "gzip": gzip.compress(self.content),
+            "zstd": zstandard.ZstdCompressor().compress(self.content),
+            "identity": self.content,
+        }
+
+        with TestClient(echo_app) as client:
+            for content_encoding, compressed_body in compressed_bodies.items():
+                with self.subTest(content_encoding):
+                    response = client.post("/echo", content=compressed_body, headers={"Content-Encoding": content_encoding})
+
+                    self.assertEqual(200, response.status_code)
+                    self.assertEqual(self.content.decode(), response.json()["body"])
+
+    def test_reject_too_large_bodies(self):
+        compressed_bodies = {
+            "gzip": gzip.compress(b"0" * 2 * 1024 * 1024),
+            "zstd": zstandard.ZstdCompressor().compress(b"0" * 2 * 1024 * 1024),
+        }
+
+        with TestClient(echo_app) as client:
+            for content_encoding, compressed_body in compressed_bodies.items():
+                with self.subTest(content_encoding):
+                    response = client.post("/echo", content=compressed_body, headers={"Content-Encoding": content_encoding})
+
+                    self.assertEqual(413, response.status_code)
+
+    def test_reject_invalid_and_unsupported_bodies(self):
+        with TestClient(echo_app) as client:
+            invalid_response = client.post("/echo", content=b"not gzip", headers={"Content-Encoding": "gzip"})
+            truncated_response = client.post(
+                "/echo", content=gzip.compress(self.content)[:100], headers={"Content-Encoding": "gzip"}
+            )
+            truncated_zstd_response = client.post(
+                "/echo",
+                content=zstandard.ZstdCompressor().compress(self.content)[:-10],
+                headers={"Content-Encoding": "zstd"},
+            )
+            invalid_zstd_response = client.post("/echo", content=b"not zstd", headers={"Content-Encoding": "zstd"})
+            unsupported_response = client.post("/echo", content=self.content, headers={"Content-Encoding": "br"})
+
+        self.assertEqual(400, invalid_response.status_code)
+        self.assertEqual(400, truncated_response.status_code)
+        self.assertEqual(400, truncated_zstd_response.status_code)
+        self.assertEqual(400, invalid_zstd_response.status_code)
+        self.assertEqual(415, unsupported_response.status_code)
+
+    def test_decompress_concatenated_zstd_frames(self):
+        zstd_compressor = zstandard.ZstdCompressor()
+        compressed_body = zstd_compressor.compress(self.content[:100]) + zstd_compressor.compress(self.content[100:])
+
+        with TestClient(echo_app) as client:
+            response = client.post("/echo", content=compressed_body, headers={"Content-Encoding": "zstd"})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.content.decode(), response.json()["body"])
+
+    def test_hand_decompressed_body_to_the_app_in_pieces(self):
+        content = b"0" * 6 * DECOMPRESSION_OUTPUT_SIZE
+        compressed_bodies = {"gzip": gzip.compress(content), "zstd": zstandard.ZstdCompressor().compress(content)}
+
+        with TestClient(echo_app) as client:
+            for content_encoding, compressed_body in compressed_bodies.items():
+                with self.subTest(content_encoding):
+                    response = client.post(
+                        "/chunks", content=compressed_body, headers={"Content-Encoding": content_encoding}
+                    )
+
+                    self.assertEqual(len(content), response.json()["size"])
+                    self.assertLessEqual(6, response.json()["count"])
+                    self.assertLessEqual(response.json()["max_size"], DECOMPRESSION_OUTPUT_SIZE)
@@ -0,0 +1,146 @@
+import shutil
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+import requests
+
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.LabeledData import LabeledData
+from trainable_entity_extractor.domain.PdfData import PdfData
+from trainable_entity_extractor.domain.PredictionData import PredictionData
+from trainable_entity_extractor.domain.PredictionSample import PredictionSample
+from trainable_entity_extractor.domain.XmlFile import XmlFile
+
+from adapters.XmlHashSidecar import XmlHashSidecar
+from config import APP_PATH, MODELS_DATA_PATH
+from drivers.samples_codecs import SAMPLES_CODECS
+from use_cases.PdfDataCacheUseCase import PdfDataCacheUseCase
+from use_cases.SampleProcessorUseCase import SampleProcessorUseCase
+
+
+class TestSampleProcessorUseCase(TestCase):
+    test_file_path = Path(APP_PATH, "tests", "resources", "tenant_test", "extraction_id", "xml_to_predict", "test.xml")
+
+    def setUp(self):
+        self.extraction_identifier = ExtractionIdentifier(
+            run_name="sample_processor_test", extraction_name="extraction_id", output_path=MODELS_DATA_PATH
+        )
+        self.prediction_data_list = [
+            PredictionData(xml_file_name=f"test_{i}.xml", entity_name=f"entity_{i}", source_text="source text")
+            for i in range(6)
+        ]
+        self.prediction_data_list.append(PredictionData(xml_file_name="missing.xml", entity_name="missing"))
+
+    def tearDown(self):
+        shutil.rmtree(Path(MODELS_DATA_PATH, "sample_processor_test"), ignore_errors=True)
+        shutil.rmtree(
+            PdfDataCacheUseCase(SAMPLES_CODECS[0], XmlHashSidecar(), "sample_processor_test").cache_dir, ignore_errors=True
+        )
+
+    def copy_xml_files(self):
+        for prediction_data in self.prediction_data_list[:-1]:
+            xml_file = XmlFile(
+                extraction_identifier=self.extraction_identifier,
+                to_train=False,
+                xml_file_name=prediction_data.xml_file_name,
+            )
+            Path(xml_file.xml_file_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self.test_file_path, xml_file.xml_file_path)
+
+    def test_parallel_parsing_matches_sequential_parsing(self):
+        self.copy_xml_files()
+        sequential_samples = SampleProcessorUseCase(
+            self.extraction_identifier, SAMPLES_CODECS, XmlHashSidecar(), parallel_parsing=False, cache_pdf_data=False
+        ).get_prediction_samples(self.prediction_data_list)
+
+        self.copy_xml_files()
+        parallel_samples = SampleProcessorUseCase(
+            self.extraction_identifier, SAMPLES_CODECS, XmlHashSidecar(), parallel_parsing=True, cache_pdf_data=False
+        ).get_prediction_samples(self.prediction_data_list)
+
+        self.assertEqual([x.entity_name for x in self.prediction_data_list], [x.entity_name for x in parallel_samples])
+        self.assertEqual([x.model_dump() for x in sequential_samples], [x.model_dump() for x in parallel_samples])
+        self.assertFalse(any(Path(MODELS_DATA_PATH, "sample_processor_test").rglob("*.xml")))
+
+    def copy_training_xml_files(self, labeled_data_list: list[LabeledData]):
+        for labeled_data in labeled_data_list:
+            xml_file = XmlFile(
+                extraction_identifier=self.extraction_identifier, to_train=True, xml_file_name=labeled_data.xml_file_name
+            )
+            Path(xml_file.xml_file_path).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(self.test_file_path, xml_file.xml_file_path)
+
+    def test_rebuild_only_parses_changed_documents(self):
+        labeled_data_list = [
+            LabeledData(tenant="sample_processor_test", id="extraction_id", xml_file_name=f"test_{i}.xml") for i in range(6)
+        ]
+        parse_pdf_data = SampleProcessorUseCase.parse_pdf_data
+        self.copy_training_xml_files(labeled_data_list)
+        with patch.object(SampleProcessorUseCase, "parse_pdf_data", side_effect=parse_pdf_data) as mock_parse_pdf_data:
+            first_samples = SampleProcessorUseCase(
+                self.extraction_identifier, SAMPLES_CODECS, XmlHashSidecar(), parallel_parsing=False
+            ).get_samples_for_training(labeled_data_list)
+            self.assertEqual(6, mock_parse_pdf_data.call_count)
+
+            self.copy_training_xml_files(labeled_data_list)
+            changed_xml_file = XmlFile(
+                extraction_identifier=self.extraction_identifier, to_train=True, xml_file_name="test_0.xml"
+            )
+            Path(changed_xml_file.xml_file_path).write_text("<pdf2xml><page number='1'></page></pdf2xml>")
+            second_samples = SampleProcessorUseCase(
+                self.extraction_identifier, SAMPLES_CODECS, XmlHashSidecar(), parallel_parsing=False
+            ).get_samples_for_training(labeled_data_list)
+
+        self.assertEqual(7, mock_parse_pdf_data.call_count)
+        self.assertNotEqual(first_samples[0].model_dump(), second_samples[0].model_dump())
+        self.assertEqual([x.model_dump() for x in first_samples[1:]], [x.model_dump() for x in second_samples[1:]])
+
+    def test_prediction_documents_are_not_cached(self):
+        self.copy_xml_files()
+        sample_processor = SampleProcessorUseCase(self.extraction_identifier, SAMPLES_CODECS, XmlHashSidecar())
+
+        prediction_samples = sample_processor.get_prediction_samples(self.prediction_data_list)
+
+        self.assertEqual(len(self.prediction_data_list), len(prediction_samples))
+        self.assertEqual([], list(sample_processor.pdf_data_cache.cache_dir.glob("*.pdf_data")))
+
+    def test_import_samples_waits_while_the_service_is_busy(self):
+        busy_response = MagicMock(status_code=503, headers={"Retry-After": "2"})
+        samples_response = MagicMock(status_code=200, headers={})
+        samples_response.json.return_value = [
+            PredictionSample(pdf_data=PdfData.from_texts(["text"]), entity_name="entity_0").model_dump()
+        ]
+        sample_processor = SampleProcessorUseCase(self.extraction_identifier, SAMPLES_CODECS, XmlHashSidecar())
+
+        with (
+            patch(
+                "use_cases.SampleProcessorUseCase.requests.get", side_effect=[busy_response, busy_response, samples_response]
+            ),
+            patch("use_cases.SampleProcessorUseCase.sleep") as mock_sleep,
+        ):
+            samples = sample_processor.get_prediction_samples_page(10)
+
+        self.assertEqual(["entity_0"], [x.entity_name for x in samples])
+        self.assertEqual([2, 2], [call.args[0] for call in mock_sleep.call_args_list])
+
+    def test_import_samples_raises_instead_of_returning_no_samples(self):
+        busy_response = MagicMock(status_code=503, headers={"Retry-After": "2"})
+        sample_processor = SampleProcessorUseCase(self.extraction_identifier, SAMPLES_CODECS, XmlHashSidecar())
+
+        with (
+            patch("use_cases.SampleProcessorUseCase.SAMPLES_REQUEST_DEADLINE", 0),
+            patch("use_cases.SampleProcessorUseCase.requests.get", return_value=busy_response),
+            patch("use_cases.SampleProcessorUseCase.sleep"),
+        ):
+            with self.assertRaises(TimeoutError):
+                sample_processor.get_prediction_samples_page(10)
+
+        with (
+            patch("use_cases.SampleProcessorUseCase.requests.get", side_effect=requests.exceptions.ConnectionError()),
+            patch("use_cases.SampleProcessorUseCase.sleep") as mock_sleep,
+        ):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                sample_processor.get_training_samples()
+
+        self.assertEqual(3, mock_sleep.call_count)
@@ -0,0 +1,130 @@
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from unittest import TestCase
+
+from config import LAST_RUN_PATH
+from drivers.samples_codecs import SAMPLES_CODECS
+from use_cases.SamplesCacheUseCase import SamplesCacheUseCase
+
+SAMPLES = [
+    {"labeled_data": {"tenant": "tenant", "id": "extraction", "label_text": "first", "page_width": 612.5}},
+    {"labeled_data": {"tenant": "tenant", "id": "extraction", "label_text": "second", "page_width": 792.0}},
+]
+
+
+class TestSamplesCacheUseCase(TestCase):
+    cache_key = "samples_training_cache_test_tenant_cache_test_extraction"
+    other_cache_key = "samples_training_cache_test_tenant_cache_test_other_extraction"
+
+    def setUp(self):
+        SamplesCacheUseCase(SAMPLES_CODECS).delete_cache(self.cache_key)
+        SamplesCacheUseCase(SAMPLES_CODECS).delete_cache(self.other_cache_key)
+
+    def tearDown(self):
+        SamplesCacheUseCase(SAMPLES_CODECS).delete_cache(self.cache_key)
+        SamplesCacheUseCase(SAMPLES_CODECS).delete_cache(self.other_cache_key)
+
+    def test_cache_samples_with_every_codec(self):
+        for samples_codec in SAMPLES_CODECS:
+            with self.subTest(samples_codec.name):
+                SamplesCacheUseCase([samples_codec]).cache_samples(self.cache_key, SAMPLES)
+
+                self.assertEqual(SAMPLES, SamplesCacheUseCase(SAMPLES_CODECS).get_cached_samples(self.cache_key))
+                file_path, cache_codec, payload_offset = SamplesCacheUseCase(SAMPLES_CODECS).get_valid_cache_file(
+                    self.cache_key
+                )
+                self.assertEqual(samples_codec.name, cache_codec.name)
+                self.assertEqual(SAMPLES, samples_codec.decode(file_path.read_bytes()[payload_offset:]))
+
+    def test_read_legacy_gzip_cache(self):
+        samples_cache = SamplesCacheUseCase(SAMPLES_CODECS)
+        legacy_file_path = samples_cache.cache_dir / f"{self.cache_key}.cache.gz"
+        with gzip.open(legacy_file_path, "wb") as f:
+            f.write(json.dumps(SAMPLES).encode("utf-8"))
+
+        file_path, samples_codec, payload_offset = samples_cache.get_valid_cache_file(self.cache_key)
+
+        self.assertEqual(SAMPLES, samples_cache.get_cached_samples(self.cache_key))
+        self.assertEqual(legacy_file_path, file_path)
+        self.assertEqual("gzip-json", samples_codec.name)
+        self.assertEqual(0, payload_offset)
+
+    def test_expired_cache(self):
+        samples_cache = SamplesCacheUseCase(SAMPLES_CODECS)
+        samples_cache.cache_samples(self.cache_key, SAMPLES)
+        samples_cache.cache_ttl = 0
+        time.sleep(0.01)
+
+        self.assertIsNone(samples_cache.get_cached_samples(self.cache_key))
+        self.assertIsNone(samples_cache.get_valid_cache_file(self.cache_key))
+
+    def test_evict_least_recently_used(self):
+        samples_cache = SamplesCacheUseCase(SAMPLES_CODECS)
+        samples_cache.cache_samples(self.cache_key, SAMPLES)
+        samples_cache.cache_samples(self.other_cache_key, SAMPLES)
+        least_recently_used_path, _, _ = samples_cache.get_valid_cache_file(self.cache_key)
+        os.utime(least_recently_used_path, (0, least_recently_used_path.stat().st_mtime))
+        evictions = SamplesCacheUseCase.statistics["evictions"]
+
+        samples_cache.max_bytes = samples_cache.get_statistics()["bytes"] - 1
+        samples_cache.cleanup()
+
+        self.assertIsNone(samples_cache.get_valid_cache_file(self.cache_key))
+        self.assertEqual(SAMPLES, samples_cache.get_cached_samples(self.other_cache_key))
+        self.assertEqual(evictions + 1, SamplesCacheUseCase.statistics["evictions"])
+
+    def test_hits_and_misses_statistics(self):
+        samples_cache = SamplesCacheUseCase(SAMPLES_CODECS)
+        hits = SamplesCacheUseCase.statistics["hits"]
+        misses = SamplesCacheUseCase.statistics["misses"]
+
+        samples_cache.get_cached_samples(self.cache_key)
+        samples_cache.cache_samples(self.cache_key, SAMPLES)
+        samples_cache.get_cached_samples(self.cache_key)
+        samples_cache.get_cached_samples(self.cache_key)
+
+        self.assertEqual(hits + 2, samples_cache.get_statistics()["hits"])
+        self.assertEqual(misses + 1, samples_cache.get_statistics()["misses"])
+
+    def test_materialized_samples_are_reused_until_cache_changes(self):
+        samples_cache = SamplesCacheUseCase(SAMPLES_CODECS)
+        samples_cache.cache_samples(self.cache_key, SAMPLES)
+        materializations = list()
+
+        def materialize(samples_dicts: list[dict]) -> list[dict]:
+            materializations.append(samples_dicts)
+            return samples_dicts
+
+        first_samples = samples_cache.get_materialized_samples(self.cache_key, materialize)
+        second_samples = SamplesCacheUseCase(SAMPLES_CODECS).get_materialized_samples(self.cache_key, materialize)
+        self.assertIsNot(first_samples, second_samples)
+        self.assertTrue(all(first is second for first, second in zip(first_samples, second_samples)))
+        self.assertEqual(1, len(materializations))
+
+        samples_cache.cache_samples(self.cache_key, SAMPLES[:1])
+        self.assertEqual(SAMPLES[:1], samples_cache.get_materialized_samples(self.cache_key, materialize))
+        self.assertEqual(2, len(materializations))
+
+        samples_cache.delete_cache(self.cache_key)
+        self.assertNotIn(self.cache_key, SamplesCacheUseCase.materialized_samples)
+        self.assertIsNone(samples_cache.get_materialized_samples(self.cache_key, materialize))
+
+    def test_only_the_latest_materialized_samples_stay_in_memory(self):
+        samples_cache = SamplesCacheUseCase(SAMPLES_CODECS)
+        samples_cache.cache_samples(self.cache_key, SAMPLES)
+        samples_cache.cache_samples(self.other_cache_key, SAMPLES[:1])
+
+        samples_cache.get_materialized_samples(self.cache_key, lambda samples_dicts: samples_dicts)
+        samples_cache.get_materialized_samples(self.other_cache_key, lambda samples_dicts: samples_dicts)
+
+        self.assertEqual([self.other_cache_key], list(SamplesCacheUseCase.materialized_samples))
+
+    def test_last_run_training_data_is_written_without_the_legacy_codec(self):
+        SamplesCacheUseCase(SAMPLES_CODECS[:1]).cache_samples(self.cache_key, SAMPLES)
+
+        with gzip.open(Path(LAST_RUN_PATH, "training_data.json.gz"), "rt", encoding="utf-8") as f:
+            self.assertEqual(SAMPLES, json.load(f))
+        self.assertEqual(2, json.loads(Path(LAST_RUN_PATH, "metadata.json").read_text())["sample_count"])
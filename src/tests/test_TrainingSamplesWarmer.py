@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.LabeledData import LabeledData
+
+from config import MODELS_DATA_PATH
+from drivers.rest.SamplesBuildExecutor import SamplesBuildExecutor
+from drivers.rest.TrainingSamplesWarmer import TrainingSamplesWarmer
+from use_cases.SampleProcessorUseCase import SampleProcessorUseCase
+
+
+def get_extraction_identifier(extraction_name: str) -> ExtractionIdentifier:
+    return ExtractionIdentifier(run_name="warmer_test_tenant", extraction_name=extraction_name, output_path=MODELS_DATA_PATH)
+
+
+def get_labeled_data(extraction_name: str) -> LabeledData:
+    return LabeledData(tenant="warmer_test_tenant", id=extraction_name, xml_file_name="test.xml", label_text="text")
+
+
+class TestTrainingSamplesWarmer(TestCase):
+    def test_evict_extractors_over_the_limit(self):
+        warmer = TrainingSamplesWarmer(SamplesBuildExecutor(1, 0), max_extractors=2)
+        with patch.object(TrainingSamplesWarmer, "schedule"):
+            for extraction_name in ["first", "second", "third"]:
+                warmer.labeled_data_arrived(get_extraction_identifier(extraction_name), [get_labeled_data(extraction_name)])
+            warmer.xml_arrived(get_extraction_identifier("second"), "test.xml")
+
+        self.assertEqual([("warmer_test_tenant", "third"), ("warmer_test_tenant", "second")], list(warmer.updated_at))
+        self.assertNotIn(("warmer_test_tenant", "first"), warmer.labeled_data)
+        self.assertEqual(1, warmer.get_statistics()["evicted_extractors"])
+        warmer.warming_executor.close()
+
+    def test_evict_expired_extractors(self):
+        warmer = TrainingSamplesWarmer(SamplesBuildExecutor(1, 0), ttl=60)
+        with patch.object(TrainingSamplesWarmer, "schedule"):
+            warmer.labeled_data_arrived(get_extraction_identifier("expired"), [get_labeled_data("expired")])
+            warmer.updated_at[("warmer_test_tenant", "expired")] -= 61
+            warmer.xml_arrived(get_extraction_identifier("recent"), "test.xml")
+
+        self.assertEqual([("warmer_test_tenant", "recent")], list(warmer.updated_at))
+        self.assertEqual(0, warmer.get_statistics()["pending_labeled_data"])
+        warmer.warming_executor.close()
+
+    def test_skip_warming_when_warming_executor_is_full(self):
+        warming_executor = SamplesBuildExecutor(1, 0)
+        warming_executor.pending = warming_executor.max_pending
+        warmer = TrainingSamplesWarmer(warming_executor, delay=0)
+        extraction_identifier = get_extraction_identifier("full")
+
+        async def warm():
+            warmer.labeled_data_arrived(extraction_identifier, [get_labeled_data("full")])
+            warmer.xml_arrived(extraction_identifier, "test.xml")
+            await warmer.tasks[warmer.get_key(extraction_identifier)]
+
+        with patch.object(SampleProcessorUseCase, "warm_pdf_data_cache") as mock_warm_pdf_data_cache:
+            asyncio.run(warm())
+
+        mock_warm_pdf_data_cache.assert_not_called()
+        self.assertEqual(dict(), warmer.tasks)
+        warming_executor.close()
+
+    def test_warm_parses_on_the_warming_thread(self):
+        warming_executor = SamplesBuildExecutor(1, 0, "samples_warming")
+        warmer = TrainingSamplesWarmer(warming_executor, delay=0)
+        extraction_identifier = get_extraction_identifier("in_thread")
+        xml_files_names = [f"test_{index}.xml" for index in range(6)]
+        parsing_threads = list()
+
+        async def warm():
+            warmer.labeled_data_arrived(
+                extraction_identifier,
+                [
+                    LabeledData(tenant="warmer_test_tenant", id="in_thread", xml_file_name=name, label_text="text")
+                    for name in xml_files_names
+                ],
+            )
+            for name in xml_files_names:
+                warmer.xml_arrived(extraction_identifier, name)
+            await warmer.tasks[warmer.get_key(extraction_identifier)]
+
+        def parse_documents(sample_processor, xml_files, *args):
+            parsing_threads.append((threading.current_thread().name, sample_processor.parallel_parsing))
+            return [None] * len(xml_files)
+
+        with (
+            patch.object(SampleProcessorUseCase, "parse_documents", autospec=True, side_effect=parse_documents),
+            patch.object(SampleProcessorUseCase, "get_parsing_pool") as mock_get_parsing_pool,
+        ):
+            asyncio.run(warm())
+
+        mock_get_parsing_pool.assert_not_called()
+        self.assertEqual(1, len(parsing_threads))
+        self.assertTrue(parsing_threads[0][0].startswith("samples_warming"))
+        self.assertFalse(parsing_threads[0][1])
+        warming_executor.close()
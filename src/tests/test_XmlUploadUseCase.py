@@ -0,0 +1,83 @@
+import hashlib
+import io
+import os
+import shutil
+from pathlib import Path
+from unittest import TestCase
+
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.XmlFile import XmlFile
+
+from adapters.XmlBlobStore import XmlBlobStore
+from adapters.XmlHashSidecar import XmlHashSidecar
+from config import MODELS_DATA_PATH, APP_PATH
+from use_cases.XmlUploadUseCase import XmlUploadUseCase, UPLOAD_CHUNK_SIZE
+
+
+class TestXmlUploadUseCase(TestCase):
+    def setUp(self):
+        self.extraction_identifier = ExtractionIdentifier(
+            run_name="xml_upload_test", extraction_name="extraction_id", output_path=MODELS_DATA_PATH
+        )
+        shutil.rmtree(Path(MODELS_DATA_PATH, "xml_upload_test"), ignore_errors=True)
+
+    def tearDown(self):
+        shutil.rmtree(Path(MODELS_DATA_PATH, "xml_upload_test"), ignore_errors=True)
+        shutil.rmtree(XmlBlobStore("xml_upload_test").blobs_path, ignore_errors=True)
+
+    @staticmethod
+    def get_xml_upload(xml_file: XmlFile) -> XmlUploadUseCase:
+        return XmlUploadUseCase(xml_file, XmlHashSidecar(), XmlBlobStore(xml_file.extraction_identifier.run_name))
+
+    def test_save_streams_content_in_chunks(self):
+        content = b"<pdf2xml>" + b"x" * (3 * UPLOAD_CHUNK_SIZE + 17) + b"</pdf2xml>"
+        xml_file = XmlFile(extraction_identifier=self.extraction_identifier, to_train=True, xml_file_name="big.xml")
+
+        content_hash = self.get_xml_upload(xml_file).save(io.BytesIO(content))
+
+        self.assertEqual(hashlib.sha256(content).hexdigest(), content_hash)
+        self.assertEqual(content, Path(xml_file.xml_file_path).read_bytes())
+        self.assertEqual(["big.xml"], [x.name for x in Path(xml_file.xml_file_path).parent.iterdir()])
+
+    def test_save_replaces_existing_file(self):
+        xml_file = XmlFile(extraction_identifier=self.extraction_identifier, to_train=False, xml_file_name="file.xml")
+
+        self.get_xml_upload(xml_file).save(io.BytesIO(b"old content"))
+        self.get_xml_upload(xml_file).save(io.BytesIO(b"new content"))
+
+        self.assertEqual(b"new content", Path(xml_file.xml_file_path).read_bytes())
+
+    def test_identical_xmls_share_one_blob(self):
+        content = Path(
+            APP_PATH, "tests", "resources", "tenant_test", "extraction_id", "xml_to_predict", "test.xml"
+        ).read_bytes()
+        other_extraction_identifier = ExtractionIdentifier(
+            run_name="xml_upload_test", extraction_name="other_extraction_id", output_path=MODELS_DATA_PATH
+        )
+        xml_file = XmlFile(extraction_identifier=self.extraction_identifier, to_train=True, xml_file_name="file.xml")
+        other_xml_file = XmlFile(extraction_identifier=other_extraction_identifier, to_train=False, xml_file_name="file.xml")
+
+        content_hash = self.get_xml_upload(xml_file).save(io.BytesIO(content))
+        self.get_xml_upload(other_xml_file).save(io.BytesIO(content))
+
+        blob_store = XmlBlobStore("xml_upload_test")
+        self.assertTrue(os.path.samefile(xml_file.xml_file_path, other_xml_file.xml_file_path))
+        self.assertEqual(content_hash, XmlHashSidecar().get_xml_hash(other_xml_file))
+        self.assertEqual(2, blob_store.get_references_count(content_hash))
+        self.assertEqual(content, Path(other_xml_file.xml_file_path).read_bytes())
+
+        xml_file.delete()
+        other_xml_file.delete()
+        blob_store.cleanup()
+
+        self.assertEqual(0, blob_store.get_references_count(content_hash))
+        self.assertFalse(blob_store.get_blob_path(content_hash).exists())
+
+    def test_xml_hash_sidecar_follows_the_uploaded_file(self):
+        xml_file = XmlFile(extraction_identifier=self.extraction_identifier, to_train=True, xml_file_name="file.xml")
+
+        content_hash = self.get_xml_upload(xml_file).save(io.BytesIO(b"<pdf2xml></pdf2xml>"))
+        self.assertEqual(content_hash, XmlHashSidecar().get_xml_hash(xml_file))
+
+        Path(xml_file.xml_file_path).write_bytes(b"<pdf2xml>changed</pdf2xml>")
+        self.assertIsNone(XmlHashSidecar().get_xml_hash(xml_file))
@@ -1,21 +1,39 @@
+import gzip
+import hashlib
 import json
 import os
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from os.path import join
+from unittest.mock import patch, MagicMock
 
 import mongomock
+import msgpack
 import pymongo
+from mongomock.collection import Collection
 from fastapi.testclient import TestClient
 from unittest import TestCase
 
 from pdf_token_type_labels.TokenType import TokenType
 from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+from trainable_entity_extractor.domain.LabeledData import LabeledData
+from trainable_entity_extractor.domain.PredictionData import PredictionData
 from trainable_entity_extractor.domain.PredictionSample import PredictionSample
 from trainable_entity_extractor.domain.Suggestion import Suggestion
 from trainable_entity_extractor.domain.SegmentBox import SegmentBox
 from trainable_entity_extractor.domain.TrainingSample import TrainingSample
 
+from adapters.MongoPersistenceRepository import MongoPersistenceRepository
+from adapters.SegmentBoxesColumnarCodec import SegmentBoxesColumnarCodec
+from adapters.XmlBlobStore import XmlBlobStore
+from adapters.XmlHashSidecar import XmlHashSidecar
+from adapters.ZstdMsgpackSamplesCodec import ZstdMsgpackSamplesCodec
 from drivers.rest.app import app
+from drivers.samples_codecs import SAMPLES_CODECS
+from use_cases.PdfDataCacheUseCase import PdfDataCacheUseCase
+from use_cases.SampleProcessorUseCase import SampleProcessorUseCase
+from use_cases.SamplesCacheUseCase import SamplesCacheUseCase
 from config import MODELS_DATA_PATH, APP_PATH, MONGO_HOST, MONGO_PORT
 
 
@@ -86,6 +104,70 @@ class TestApp(TestCase):
 
         shutil.rmtree(join(MODELS_DATA_PATH, tenant), ignore_errors=True)
 
+    def test_xml_upload_preflight_and_attach_by_hash(self):
+        tenant = "preflight_test_tenant"
+        shutil.rmtree(join(MODELS_DATA_PATH, tenant), ignore_errors=True)
+        with open(self.test_file_path, "rb") as stream:
+            xml_hash = hashlib.sha256(stream.read()).hexdigest()
+        unknown_hash = hashlib.sha256(b"unknown").hexdigest()
+        reference = {"xml_file_name": "test.xml", "xml_hash": xml_hash}
+
+        with TestClient(app) as client:
+            missing_before_upload = client.post(f"/xml_missing_hashes/{tenant}", json=[xml_hash, unknown_hash]).json()
+            with open(self.test_file_path, "rb") as stream:
+                client.post(f"/xml_to_train/{tenant}/extraction_id", files={"file": stream})
+            missing_after_upload = client.post(f"/xml_missing_hashes/{tenant}", json=[xml_hash, unknown_hash]).json()
+            train_response = client.post(f"/xml_to_train_by_hash/{tenant}/other_extraction_id", json=reference)
+            predict_response = client.post(f"/xml_to_predict_by_hash/{tenant}/other_extraction_id", json=reference)
+            unknown_response = client.post(
+                f"/xml_to_predict_by_hash/{tenant}/other_extraction_id",
+                json={"xml_file_name": "a.xml", "xml_hash": unknown_hash},
+            )
+            invalid_response = client.post(
+                f"/xml_to_predict_by_hash/{tenant}/other_extraction_id",
+                json={"xml_file_name": "../a.xml", "xml_hash": xml_hash},
+            )
+
+        self.assertEqual([xml_hash, unknown_hash], missing_before_upload)
+        self.assertEqual([unknown_hash], missing_after_upload)
+        self.assertEqual(200, train_response.status_code)
+        self.assertEqual(200, predict_response.status_code)
+        self.assertEqual(404, unknown_response.status_code)
+        self.assertEqual(422, invalid_response.status_code)
+        for folder in ["xml_to_train", "xml_to_predict"]:
+            with open(join(MODELS_DATA_PATH, tenant, "other_extraction_id", folder, "test.xml"), "rb") as stream:
+                self.assertEqual(xml_hash, hashlib.sha256(stream.read()).hexdigest())
+
+        shutil.rmtree(join(MODELS_DATA_PATH, tenant), ignore_errors=True)
+        shutil.rmtree(XmlBlobStore(tenant).blobs_path, ignore_errors=True)
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_post_gzip_compressed_labeled_data(self):
+        tenant = "compressed_request_test"
+        extraction_id = "extraction_id"
+        mongo_client = pymongo.MongoClient("mongodb://127.0.0.1:29017")
+        json_data = {
+            "tenant": tenant,
+            "id": extraction_id,
+            "xml_file_name": "xml_file_name",
+            "label_text": "text",
+            "page_width": 1.1,
+            "page_height": 2.1,
+            "xml_segments_boxes": [
+                {"left": 1, "top": 2, "width": 3, "height": 4, "page_width": 5, "page_height": 6, "page_number": 5}
+            ]
+            * 100,
+            "label_segments_boxes": [],
+        }
+        headers = {"Content-Encoding": "gzip", "Content-Type": "application/json"}
+
+        with TestClient(app) as client:
+            response = client.post("/labeled_data", content=gzip.compress(json.dumps(json_data).encode()), headers=headers)
+
+        labeled_data_document = mongo_client.pdf_metadata_extraction.labeled_data.find_one({"tenant": tenant})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(100, len(labeled_data_document["xml_segments_boxes"]))
+
     @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
     def test_post_labeled_data(self):
         tenant = "endpoint_test"
@@ -312,6 +394,108 @@ class TestApp(TestCase):
             prediction_data_document["xml_segments_boxes"],
         )
 
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_post_labeled_data_list(self):
+        mongo_client = pymongo.MongoClient("mongodb://127.0.0.1:29017")
+
+        json_data = [
+            {
+                "tenant": tenant,
+                "id": extraction_id,
+                "xml_file_name": f"{tenant}_{extraction_id}.xml",
+                "language_iso": "en",
+                "label_text": "text",
+                "page_width": 1.1,
+                "page_height": 2.1,
+                "xml_segments_boxes": [],
+                "label_segments_boxes": [
+                    {"left": 8, "top": 12, "width": 16, "height": 20, "page_width": 5, "page_height": 6, "page_number": 1}
+                ],
+            }
+            for tenant, extraction_id in [
+                ("tenant_1", "extraction_1"),
+                ("tenant_1", "extraction_2"),
+                ("tenant_1", "extraction_1"),
+            ]
+        ]
+
+        with TestClient(app) as client:
+            response = client.post("/labeled_data_list", json=json_data)
+
+        labeled_data_collection = mongo_client.pdf_metadata_extraction.labeled_data
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, labeled_data_collection.count_documents({}))
+        self.assertEqual(
+            2, labeled_data_collection.count_documents({"run_name": "tenant_1", "extraction_name": "extraction_1"})
+        )
+        self.assertEqual(
+            1, labeled_data_collection.count_documents({"run_name": "tenant_1", "extraction_name": "extraction_2"})
+        )
+        labeled_data_document = labeled_data_collection.find_one({"extraction_name": "extraction_2"})
+        self.assertEqual("tenant_1_extraction_2.xml", labeled_data_document["xml_file_name"])
+        self.assertEqual(6, labeled_data_document["label_segments_boxes"][0]["left"])
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_post_prediction_data_list(self):
+        mongo_client = pymongo.MongoClient("mongodb://127.0.0.1:29017")
+
+        json_data = [
+            {
+                "tenant": "tenant_1",
+                "id": "extraction_1",
+                "xml_file_name": f"file_{index}.xml",
+                "page_width": 612,
+                "page_height": 792,
+                "xml_segments_boxes": [],
+            }
+            for index in range(5)
+        ]
+
+        with TestClient(app) as client:
+            response = client.post("/prediction_data_list", json=json_data)
+            empty_response = client.post("/prediction_data_list", json=[])
+
+        prediction_data_collection = mongo_client.pdf_metadata_extraction.prediction_data
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(200, empty_response.status_code)
+        self.assertEqual(
+            5, prediction_data_collection.count_documents({"run_name": "tenant_1", "extraction_name": "extraction_1"})
+        )
+        self.assertEqual(
+            {f"file_{index}.xml" for index in range(5)}, {x["xml_file_name"] for x in prediction_data_collection.find()}
+        )
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_get_samples_prediction_in_pages(self):
+        json_data = [
+            {
+                "tenant": "paged_prediction_tenant",
+                "id": "paged_prediction_extraction",
+                "entity_name": f"entity_{index}",
+                "xml_file_name": f"file_{index}.xml",
+                "page_width": 612,
+                "page_height": 792,
+                "xml_segments_boxes": [],
+            }
+            for index in range(5)
+        ]
+
+        with TestClient(app) as client:
+            client.post("/prediction_data_list", json=json_data)
+            pages = [
+                client.get("/get_samples_prediction/paged_prediction_tenant/paged_prediction_extraction?limit=2").json()
+                for _ in range(4)
+            ]
+            invalid_limit_response = client.get(
+                "/get_samples_prediction/paged_prediction_tenant/paged_prediction_extraction?limit=0"
+            )
+
+        self.assertEqual([2, 2, 1, 0], [len(page) for page in pages])
+        self.assertEqual([f"entity_{index}" for index in range(5)], [x["entity_name"] for page in pages for x in page])
+        self.assertEqual(422, invalid_limit_response.status_code)
+
     @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
     def test_get_suggestions(self):
         print(f"mongodb://{MONGO_HOST}:{MONGO_PORT}")
@@ -555,6 +739,53 @@ class TestApp(TestCase):
         self.assertEqual(200, response.status_code)
         self.assertEqual(0, len(suggestions))
 
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_get_suggestions_page(self):
+        tenant = "example_tenant_name"
+        extraction_id = "prediction_extraction_id"
+
+        mongo_client = pymongo.MongoClient("mongodb://127.0.0.1:29017")
+
+        json_data = [
+            {
+                "run_name": run_name,
+                "extraction_name": extraction_id,
+                "tenant": run_name,
+                "id": extraction_id,
+                "xml_file_name": f"file_{index}.xml",
+                "text": f"text_{index}",
+                "page_number": 1,
+                "segments_boxes": [
+                    {"left": 3, "top": 6, "width": 9, "height": 12, "page_width": 5, "page_height": 6, "page_number": 1}
+                ],
+            }
+            for index, run_name in enumerate([tenant] * 5 + ["other tenant"])
+        ]
+
+        mongo_client.pdf_metadata_extraction.suggestions.insert_many(json_data)
+
+        suggestions_collection = mongo_client.pdf_metadata_extraction.suggestions
+        url = f"/get_suggestions_page/{tenant}/{extraction_id}?page_size=2"
+        with TestClient(app) as client:
+            first_page = client.get(url).json()
+            repeated_first_page = client.get(url).json()
+            self.assertEqual(6, suggestions_collection.count_documents({}))
+
+            second_page = client.get(url + f"&after_id={first_page['after_id']}").json()
+            self.assertEqual(4, suggestions_collection.count_documents({}))
+
+            third_page = client.get(url + f"&after_id={second_page['after_id']}").json()
+            last_page = client.get(url + f"&after_id={third_page['after_id']}").json()
+
+        suggestions = first_page["suggestions"] + second_page["suggestions"] + third_page["suggestions"]
+        self.assertEqual(first_page, repeated_first_page)
+        self.assertEqual([f"file_{index}.xml" for index in range(5)], [x["xml_file_name"] for x in suggestions])
+        self.assertEqual({tenant}, {x["tenant"] for x in suggestions})
+        self.assertEqual(4, suggestions[0]["segments_boxes"][0]["left"])
+        self.assertEqual({"after_id": third_page["after_id"], "suggestions": []}, last_page)
+        self.assertEqual(1, suggestions_collection.count_documents({}))
+        self.assertEqual("other tenant", suggestions_collection.find_one()["tenant"])
+
     @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
     def test_save_suggestions(self):
         tenant = "example_tenant_name"
@@ -616,6 +847,220 @@ class TestApp(TestCase):
             suggestion_document["segments_boxes"],
         )
 
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_save_suggestions_in_batches(self):
+        extraction_identifier = ExtractionIdentifier(
+            run_name="example_tenant_name", extraction_name="prediction_extraction_id", output_path=MODELS_DATA_PATH
+        )
+        suggestions = [
+            Suggestion(
+                tenant="example_tenant_name",
+                id="prediction_extraction_id",
+                xml_file_name=f"xml_file_name_{i}",
+                entity_name=f"entity_name_{i}",
+                text=f"text_predicted_{i}",
+                segment_text="segment_text",
+                page_number=1,
+            )
+            for i in range(5)
+        ]
+
+        persistence_repository = MongoPersistenceRepository(write_batch_size=2)
+        with patch.object(Collection, "insert_many", autospec=True, side_effect=Collection.insert_many) as insert_many:
+            persistence_repository.save_suggestions(extraction_identifier, suggestions)
+            persistence_repository.save_suggestions(extraction_identifier, [])
+
+        self.assertEqual(3, insert_many.call_count)
+        self.assertTrue(all(not call.kwargs["ordered"] for call in insert_many.call_args_list))
+        suggestions_collection = pymongo.MongoClient("mongodb://127.0.0.1:29017").pdf_metadata_extraction.suggestions
+        self.assertEqual(
+            [f"entity_name_{i}" for i in range(5)], [x["entity_name"] for x in suggestions_collection.find().sort("_id")]
+        )
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_claim_and_delete_concurrent_consumers(self):
+        extraction_identifier = ExtractionIdentifier(
+            run_name="claim_tenant", extraction_name="claim_extraction", output_path=MODELS_DATA_PATH
+        )
+        other_extraction_identifier = ExtractionIdentifier(
+            run_name="claim_tenant", extraction_name="other_extraction", output_path=MODELS_DATA_PATH
+        )
+        persistence_repository = MongoPersistenceRepository(claim_batch_size=3)
+        persistence_repository.save_prediction_data_list(
+            extraction_identifier, [PredictionData(xml_file_name=f"{i}.xml", entity_name=f"entity_{i}") for i in range(10)]
+        )
+        persistence_repository.save_prediction_data_list(
+            other_extraction_identifier, [PredictionData(xml_file_name="other.xml", entity_name="other")]
+        )
+
+        held_documents = persistence_repository.claim_batch(extraction_identifier, "prediction_data", "slow_consumer", 3)
+        prediction_data = persistence_repository.load_and_delete_prediction_data(extraction_identifier)
+        persistence_repository.save_prediction_data(
+            extraction_identifier, PredictionData(xml_file_name="late.xml", entity_name="late")
+        )
+        late_prediction_data = persistence_repository.load_and_delete_prediction_data(extraction_identifier)
+
+        self.assertEqual([f"entity_{i}" for i in range(3)], [x["entity_name"] for x in held_documents])
+        self.assertEqual([f"entity_{i}" for i in range(3, 10)], [x.entity_name for x in prediction_data])
+        self.assertEqual(["late"], [x.entity_name for x in late_prediction_data])
+        prediction_data_collection = pymongo.MongoClient("mongodb://127.0.0.1:29017").pdf_metadata_extraction.prediction_data
+        self.assertEqual(
+            ["entity_0", "entity_1", "entity_2", "other"],
+            [x["entity_name"] for x in prediction_data_collection.find().sort("_id")],
+        )
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_claim_and_delete_queries_are_scoped_to_the_extraction(self):
+        extraction_identifier = ExtractionIdentifier(
+            run_name="claim_tenant", extraction_name="claim_extraction", output_path=MODELS_DATA_PATH
+        )
+        persistence_repository = MongoPersistenceRepository(claim_batch_size=2)
+        persistence_repository.save_prediction_data_list(
+            extraction_identifier, [PredictionData(xml_file_name=f"{i}.xml", entity_name=f"entity_{i}") for i in range(5)]
+        )
+
+        with (
+            patch.object(Collection, "update_many", autospec=True, side_effect=Collection.update_many) as update_many,
+            patch.object(Collection, "delete_many", autospec=True, side_effect=Collection.delete_many) as delete_many,
+        ):
+            prediction_data = persistence_repository.load_and_delete_prediction_data(extraction_identifier)
+
+        self.assertEqual(5, len(prediction_data))
+        for call in update_many.call_args_list + delete_many.call_args_list:
+            self.assertEqual("claim_tenant", call.args[1]["run_name"])
+            self.assertEqual("claim_extraction", call.args[1]["extraction_name"])
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_claim_and_delete_keeps_data_when_loading_fails(self):
+        extraction_identifier = ExtractionIdentifier(
+            run_name="claim_tenant", extraction_name="claim_extraction", output_path=MODELS_DATA_PATH
+        )
+        persistence_repository = MongoPersistenceRepository(claim_batch_size=2)
+        persistence_repository.save_labeled_data_list(
+            extraction_identifier,
+            [LabeledData(tenant="claim_tenant", id="claim_extraction", xml_file_name=f"{i}.xml") for i in range(5)],
+        )
+
+        data_class = MagicMock(side_effect=[MagicMock(), MagicMock(), MagicMock(), ValueError("invalid document")])
+        with self.assertRaises(ValueError):
+            persistence_repository.claim_and_delete(extraction_identifier, "labeled_data", data_class)
+
+        labeled_data = persistence_repository.load_and_delete_labeled_data(extraction_identifier)
+        self.assertEqual([f"{i}.xml" for i in range(5)], [x.xml_file_name for x in labeled_data])
+        self.assertEqual([], persistence_repository.load_and_delete_labeled_data(extraction_identifier))
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_claim_and_delete_fails_when_the_claim_is_taken_over(self):
+        extraction_identifier = ExtractionIdentifier(
+            run_name="claim_tenant", extraction_name="claim_extraction", output_path=MODELS_DATA_PATH
+        )
+        persistence_repository = MongoPersistenceRepository(claim_batch_size=2)
+        persistence_repository.save_labeled_data_list(
+            extraction_identifier,
+            [LabeledData(tenant="claim_tenant", id="claim_extraction", xml_file_name=f"{i}.xml") for i in range(5)],
+        )
+        labeled_data_collection = pymongo.MongoClient("mongodb://127.0.0.1:29017").pdf_metadata_extraction.labeled_data
+
+        def take_over_claim(**document):
+            if document["xml_file_name"] == "2.xml":
+                labeled_data_collection.update_one({"xml_file_name": "0.xml"}, {"$set": {"claim_token": "other_consumer"}})
+            return LabeledData(**document)
+
+        with self.assertRaises(RuntimeError):
+            persistence_repository.claim_and_delete(extraction_identifier, "labeled_data", take_over_claim)
+
+        self.assertEqual(5, labeled_data_collection.count_documents({}))
+        self.assertEqual(
+            ["0.xml"], [x["xml_file_name"] for x in labeled_data_collection.find({"claim_token": {"$exists": True}})]
+        )
+        labeled_data = persistence_repository.load_and_delete_labeled_data(extraction_identifier)
+        self.assertEqual([f"{i}.xml" for i in range(1, 5)], [x.xml_file_name for x in labeled_data])
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_save_large_segment_boxes_lists_in_columns(self):
+        extraction_identifier = ExtractionIdentifier(
+            run_name="columnar_tenant", extraction_name="columnar_extraction", output_path=MODELS_DATA_PATH
+        )
+        segment_types = [TokenType.TEXT, TokenType.TITLE, TokenType.FOOTNOTE]
+        segment_boxes = [
+            SegmentBox(
+                left=i / 7,
+                top=i * 1.5,
+                width=10,
+                height=2.25,
+                page_width=612,
+                page_height=792,
+                page_number=i // 50 + 1,
+                segment_type=segment_types[i % 3],
+            )
+            for i in range(300)
+        ]
+        labeled_data = LabeledData(
+            tenant="columnar_tenant",
+            id="columnar_extraction",
+            xml_file_name="large.xml",
+            xml_segments_boxes=segment_boxes,
+            label_segments_boxes=segment_boxes[:2],
+        )
+        prediction_data = PredictionData(xml_file_name="large.xml", entity_name="entity", xml_segments_boxes=segment_boxes)
+        mongo_db = pymongo.MongoClient("mongodb://127.0.0.1:29017").pdf_metadata_extraction
+
+        for compress in [True, False]:
+            with self.subTest(compress=compress):
+                persistence_repository = MongoPersistenceRepository(
+                    columnar_threshold=256, segment_boxes_codec=SegmentBoxesColumnarCodec(compress=compress)
+                )
+                persistence_repository.save_labeled_data(extraction_identifier, labeled_data)
+                persistence_repository.save_prediction_data_list(extraction_identifier, [prediction_data])
+
+                labeled_data_document = mongo_db.labeled_data.find_one()
+                self.assertEqual(300, labeled_data_document["xml_segments_boxes"]["count"])
+                self.assertEqual(2, len(labeled_data_document["label_segments_boxes"]))
+                self.assertEqual(
+                    [labeled_data.model_dump()],
+                    [x.model_dump() for x in persistence_repository.load_and_delete_labeled_data(extraction_identifier)],
+                )
+                self.assertEqual(
+                    [prediction_data.model_dump()],
+                    [x.model_dump() for x in persistence_repository.load_and_delete_prediction_data(extraction_identifier)],
+                )
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_persistence_indexes(self):
+        mongo_db = pymongo.MongoClient("mongodb://127.0.0.1:29017").pdf_metadata_extraction
+        index_stats = [{"name": "run_name_extraction_name", "accesses": {"ops": 3, "since": "2024-01-01T00:00:00"}}]
+
+        with TestClient(app) as client:
+            MongoPersistenceRepository().create_indexes(transient_data_ttl=3600)
+            MongoPersistenceRepository().create_indexes(transient_data_ttl=0)
+            MongoPersistenceRepository().create_indexes(transient_data_ttl=3600)
+            with patch.object(Collection, "aggregate", return_value=index_stats):
+                response = client.get("/persistence_indexes_usage")
+
+        self.assertEqual(200, response.status_code)
+        for collection_name in ["labeled_data", "prediction_data", "suggestions", "paragraphs_from_languages"]:
+            indexes = mongo_db[collection_name].index_information()
+            self.assertEqual({"_id_", "run_name_extraction_name", "created_at_ttl"}, set(indexes))
+            self.assertEqual(
+                [("run_name", 1), ("extraction_name", 1), ("_id", 1)], indexes["run_name_extraction_name"]["key"]
+            )
+            self.assertEqual(3600, indexes["created_at_ttl"]["expireAfterSeconds"])
+        self.assertEqual({"_id_", "run_name_extraction_name"}, set(mongo_db.paragraph_extraction_data.index_information()))
+
+        suggestions_indexes = {index["name"]: index for index in response.json()["suggestions"]}
+        self.assertEqual(3, suggestions_indexes["run_name_extraction_name"]["operations"])
+        self.assertEqual(0, suggestions_indexes["created_at_ttl"]["operations"])
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_persistence_indexes_usage_error(self):
+        with TestClient(app) as client:
+            with patch.object(
+                Collection, "aggregate", side_effect=pymongo.errors.OperationFailure("$indexStats not allowed")
+            ):
+                response = client.get("/persistence_indexes_usage")
+
+        self.assertEqual(422, response.status_code)
+
     @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
     def test_get_samples_training(self):
         tenant = "example_tenant_name"
@@ -814,6 +1259,167 @@ class TestApp(TestCase):
             first_training_samples[1].labeled_data.label_text, second_training_samples[1].labeled_data.label_text
         )
 
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_get_samples_training_cached_as_compressed_file(self):
+        tenant = "compressed_cache_test_tenant"
+        extraction_id = "compressed_cache_test_extraction"
+
+        labeled_data = {
+            "tenant": tenant,
+            "id": extraction_id,
+            "xml_file_name": "test_file.xml",
+            "label_text": "sample_text",
+            "page_width": 612.0,
+            "page_height": 792.0,
+            "xml_segments_boxes": [],
+            "label_segments_boxes": [],
+        }
+
+        headers = {"Accept": "application/x-msgpack", "Accept-Encoding": "zstd"}
+        with TestClient(app) as client:
+            client.post("/labeled_data", json=labeled_data)
+            first_response = client.get(f"/get_samples_training/{tenant}/{extraction_id}")
+            with client.stream("GET", f"/get_samples_training/{tenant}/{extraction_id}", headers=headers) as response:
+                compressed_response = response
+                compressed_content = b"".join(response.iter_raw())
+            uncompressed_response = client.get(
+                f"/get_samples_training/{tenant}/{extraction_id}", headers={"Accept-Encoding": "identity"}
+            )
+
+        compressed_samples = ZstdMsgpackSamplesCodec().decode(compressed_content)
+
+        self.assertEqual(200, compressed_response.status_code)
+        self.assertEqual("application/x-msgpack", compressed_response.headers["content-type"])
+        self.assertEqual("zstd", compressed_response.headers["content-encoding"])
+        self.assertNotIn("content-encoding", uncompressed_response.headers)
+        self.assertEqual(first_response.json(), compressed_samples)
+        self.assertEqual(first_response.json(), uncompressed_response.json())
+        self.assertEqual("sample_text", TrainingSample(**compressed_samples[0]).labeled_data.label_text)
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_training_documents_are_prebuilt_when_labeled_data_and_xml_arrive(self):
+        tenant = "warming_test_tenant"
+        extraction_id = "warming_test_extraction"
+        pdf_data_cache = PdfDataCacheUseCase(SAMPLES_CODECS[0], XmlHashSidecar(), tenant)
+        shutil.rmtree(pdf_data_cache.cache_dir, ignore_errors=True)
+        SamplesCacheUseCase(SAMPLES_CODECS).delete_cache(SamplesCacheUseCase.get_training_cache_key(tenant, extraction_id))
+
+        labeled_data = {
+            "tenant": tenant,
+            "id": extraction_id,
+            "xml_file_name": "test.xml",
+            "label_text": "sample_text",
+            "page_width": 612.0,
+            "page_height": 792.0,
+            "xml_segments_boxes": [],
+            "label_segments_boxes": [],
+        }
+
+        with TestClient(app) as client:
+            app.training_samples_warmer.delay = 0
+            with open(self.test_file_path, "rb") as stream:
+                client.post(f"/xml_to_train/{tenant}/{extraction_id}", files={"file": stream})
+            client.post("/labeled_data", json=labeled_data)
+
+            for _ in range(50):
+                if list(pdf_data_cache.cache_dir.glob("*.pdf_data")):
+                    break
+                time.sleep(0.1)
+
+            with patch.object(SampleProcessorUseCase, "parse_documents", return_value=[]) as mock_parse_documents:
+                response = client.get(f"/get_samples_training/{tenant}/{extraction_id}")
+
+        self.assertEqual(1, len(list(pdf_data_cache.cache_dir.glob("*.pdf_data"))))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("sample_text", response.json()[0]["labeled_data"]["label_text"])
+        self.assertEqual([], mock_parse_documents.call_args.args[0])
+        shutil.rmtree(pdf_data_cache.cache_dir, ignore_errors=True)
+        shutil.rmtree(join(MODELS_DATA_PATH, tenant), ignore_errors=True)
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_endpoints_latency(self):
+        with TestClient(app) as client:
+            client.get("/info")
+            client.get("/get_samples_prediction/latency_test_tenant/latency_test_extraction")
+            response = client.get("/endpoints_latency")
+
+        endpoints = response.json()["endpoints"]
+        self.assertEqual(200, response.status_code)
+        self.assertLessEqual(1, endpoints["GET /info"]["count"])
+        self.assertLessEqual(1, endpoints["GET /get_samples_prediction/{run_name}/{extraction_name}"]["count"])
+        self.assertLessEqual(endpoints["GET /info"]["p50_ms"], endpoints["GET /info"]["max_ms"])
+        self.assertEqual(0, response.json()["samples_build_executor"]["pending"])
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_samples_requests_keep_data_when_executor_is_full(self):
+        tenant = "full_executor_test_tenant"
+        extraction_id = "full_executor_test_extraction"
+        SamplesCacheUseCase(SAMPLES_CODECS).delete_cache(SamplesCacheUseCase.get_training_cache_key(tenant, extraction_id))
+        data = {
+            "tenant": tenant,
+            "id": extraction_id,
+            "xml_file_name": "test.xml",
+            "page_width": 612.0,
+            "page_height": 792.0,
+            "xml_segments_boxes": [],
+        }
+
+        with TestClient(app) as client:
+            client.post("/labeled_data", json={**data, "label_text": "text", "label_segments_boxes": []})
+            client.post("/prediction_data", json={**data, "entity_name": "entity_name", "source_text": "text"})
+            app.samples_build_executor.pending = app.samples_build_executor.max_pending
+            training_response = client.get(f"/get_samples_training/{tenant}/{extraction_id}")
+            prediction_response = client.get(f"/get_samples_prediction/{tenant}/{extraction_id}")
+            page_response = client.get(f"/get_samples_prediction/{tenant}/{extraction_id}", params={"limit": 1})
+            app.samples_build_executor.pending = 0
+
+        mongo_client = pymongo.MongoClient("mongodb://127.0.0.1:29017")
+        self.assertEqual([503] * 3, [x.status_code for x in [training_response, prediction_response, page_response]])
+        self.assertEqual("5", training_response.headers["Retry-After"])
+        self.assertEqual(1, mongo_client.pdf_metadata_extraction.labeled_data.count_documents({"tenant": tenant}))
+        self.assertEqual(1, mongo_client.pdf_metadata_extraction.prediction_data.count_documents({"tenant": tenant}))
+
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_get_samples_training_concurrent_requests_build_once(self):
+        tenant = "single_flight_test_tenant"
+        extraction_id = "single_flight_test_extraction"
+        SamplesCacheUseCase(SAMPLES_CODECS).delete_cache(SamplesCacheUseCase.get_training_cache_key(tenant, extraction_id))
+
+        labeled_data_list = [
+            {
+                "tenant": tenant,
+                "id": extraction_id,
+                "xml_file_name": f"test_file_{i}.xml",
+                "label_text": f"sample_text_{i}",
+                "page_width": 612.0,
+                "page_height": 792.0,
+                "xml_segments_boxes": [],
+                "label_segments_boxes": [],
+            }
+            for i in range(3)
+        ]
+
+        get_samples_for_training = SampleProcessorUseCase.get_samples_for_training
+
+        def slow_get_samples_for_training(sample_processor, labeled_data_list):
+            time.sleep(0.3)
+            return get_samples_for_training(sample_processor, labeled_data_list)
+
+        with patch.object(
+            SampleProcessorUseCase, "get_samples_for_training", autospec=True, side_effect=slow_get_samples_for_training
+        ) as mock_get_samples_for_training:
+            with TestClient(app) as client:
+                client.post("/labeled_data_list", json=labeled_data_list)
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    responses = list(
+                        executor.map(lambda _: client.get(f"/get_samples_training/{tenant}/{extraction_id}"), range(4))
+                    )
+
+        self.assertEqual(1, mock_get_samples_for_training.call_count)
+        self.assertEqual([200] * 4, [response.status_code for response in responses])
+        self.assertEqual(3, len(responses[0].json()))
+        self.assertTrue(all(response.json() == responses[0].json() for response in responses))
+
     @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
     def test_get_samples_prediction(self):
         tenant = "example_tenant_name"
@@ -862,6 +1468,42 @@ class TestApp(TestCase):
         self.assertEqual("entity_name", prediction_samples[0].entity_name)
         self.assertEqual("other_entity_name", prediction_samples[1].entity_name)
 
+    @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
+    def test_get_samples_prediction_as_msgpack(self):
+        tenant = "example_tenant_name"
+        extraction_id = "msgpack_extraction_id"
+
+        prediction_data = [
+            {
+                "run_name": tenant,
+                "extraction_name": extraction_id,
+                "tenant": tenant,
+                "id": extraction_id,
+                "entity_name": f"entity_name_{index}",
+                "xml_file_name": "",
+                "source_text": f"text_{index}",
+                "page_width": 1.1,
+                "page_height": 2.1,
+                "xml_segments_boxes": [],
+            }
+            for index in range(3)
+        ]
+
+        mongo_client = pymongo.MongoClient("mongodb://127.0.0.1:29017")
+        mongo_client.pdf_metadata_extraction.prediction_data.insert_many(prediction_data)
+
+        headers = {"Accept": "application/x-msgpack, application/json", "Accept-Encoding": "gzip"}
+        with TestClient(app) as client:
+            response = client.get(f"/get_samples_prediction/{tenant}/{extraction_id}", headers=headers)
+
+        prediction_samples = [PredictionSample(**x) for x in msgpack.unpackb(response.content, raw=False)]
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/x-msgpack", response.headers["content-type"])
+        self.assertEqual("gzip", response.headers["content-encoding"])
+        self.assertEqual([f"text_{index}" for index in range(3)], [x.source_text for x in prediction_samples])
+        self.assertEqual([f"entity_name_{index}" for index in range(3)], [x.entity_name for x in prediction_samples])
+
     @mongomock.patch(servers=["mongodb://127.0.0.1:29017"])
     def test_delete_extractor(self):
         run_name = "test_run"
@@ -0,0 +1,117 @@
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from trainable_entity_extractor.domain.ExtractionIdentifier import ExtractionIdentifier
+
+from config import MODELS_DATA_PATH, XML_BLOBS_PATH
+from drivers.distributed_worker import distributed_flow
+from drivers.distributed_worker.distributed_flow import cleanup_old_model_folders, _predict_in_chunks
+
+CHUNK_SIZE = 2
+
+
+class TestDistributedFlow(TestCase):
+    def test_cleanup_old_model_folders_keeps_xml_blobs(self):
+        old_model_folder = Path(MODELS_DATA_PATH, "cleanup_test_tenant")
+        blob_path = Path(XML_BLOBS_PATH, "cleanup_test_tenant", "ab", "blob.xml")
+        old_model_folder.mkdir(parents=True, exist_ok=True)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        blob_path.write_bytes(b"<pdf2xml></pdf2xml>")
+        four_days_ago = time.time() - 4 * 86400
+        for path in [old_model_folder, blob_path.parent, blob_path.parent.parent, Path(XML_BLOBS_PATH)]:
+            os.utime(path, (four_days_ago, four_days_ago))
+
+        cleanup_old_model_folders(max_age_days=3)
+
+        self.assertFalse(old_model_folder.exists())
+        self.assertTrue(blob_path.exists())
+        shutil.rmtree(blob_path.parent.parent, ignore_errors=True)
+
+    def predict_in_chunks(self, pages: list[list[str]], send_results: list[bool] = None, send_delay: float = 0):
+        sample_processor = MagicMock()
+        sample_processor.get_prediction_samples_page.side_effect = pages
+        send_results = iter(send_results or [True] * len(pages))
+
+        def send_suggestions(extraction_identifier, suggestions):
+            time.sleep(send_delay)
+            return next(send_results), ""
+
+        extraction_identifier = ExtractionIdentifier(
+            run_name="predict_test_tenant", extraction_name="predict_test_extraction", output_path=MODELS_DATA_PATH
+        )
+        with (
+            patch.object(distributed_flow, "PREDICTION_SAMPLES_CHUNK_SIZE", CHUNK_SIZE),
+            patch.object(
+                distributed_flow.predict_use_case, "predict", side_effect=lambda job, samples: samples, create=True
+            ),
+            patch.object(distributed_flow, "_send_suggestions", side_effect=send_suggestions) as mock_send_suggestions,
+        ):
+            success = _predict_in_chunks(MagicMock(), extraction_identifier, sample_processor)
+
+        sent_suggestions = [call.args[1] for call in mock_send_suggestions.call_args_list]
+        return success, sample_processor.get_prediction_samples_page.call_count, sent_suggestions
+
+    def test_predict_in_chunks_exact_multiple_of_the_chunk_size(self):
+        pages = [["a", "b"], ["c", "d"], []]
+
+        success, pages_requested, sent_suggestions = self.predict_in_chunks(pages)
+
+        self.assertTrue(success)
+        self.assertEqual(3, pages_requested)
+        self.assertEqual([["a", "b"], ["c", "d"]], sent_suggestions)
+
+    def test_predict_in_chunks_empty_first_page(self):
+        success, pages_requested, sent_suggestions = self.predict_in_chunks([[]])
+
+        self.assertTrue(success)
+        self.assertEqual(1, pages_requested)
+        self.assertEqual([], sent_suggestions)
+
+    def test_predict_in_chunks_stops_after_a_failed_send(self):
+        pages = [["a", "b"], ["c", "d"], ["e"]]
+
+        success, _, sent_suggestions = self.predict_in_chunks(pages, send_results=[False, True, True])
+
+        self.assertFalse(success)
+        self.assertEqual([["a", "b"]], sent_suggestions)
+
+    def test_predict_in_chunks_holds_at_most_three_chunks(self):
+        pages = [[f"{page}_{sample}" for sample in range(CHUNK_SIZE)] for page in range(6)] + [[]]
+        held_chunks = 0
+        max_held_chunks = 0
+        lock = threading.Lock()
+
+        def get_page(limit: int):
+            nonlocal held_chunks, max_held_chunks
+            page = pages.pop(0)
+            with lock:
+                held_chunks += 1 if page else 0
+                max_held_chunks = max(max_held_chunks, held_chunks)
+            return page
+
+        def send_suggestions(extraction_identifier, suggestions):
+            nonlocal held_chunks
+            time.sleep(0.02)
+            with lock:
+                held_chunks -= 1
+            return True, ""
+
+        sample_processor = MagicMock()
+        sample_processor.get_prediction_samples_page.side_effect = get_page
+        with (
+            patch.object(distributed_flow, "PREDICTION_SAMPLES_CHUNK_SIZE", CHUNK_SIZE),
+            patch.object(
+                distributed_flow.predict_use_case, "predict", side_effect=lambda job, samples: samples, create=True
+            ),
+            patch.object(distributed_flow, "_send_suggestions", side_effect=send_suggestions),
+        ):
+            success = _predict_in_chunks(MagicMock(), MagicMock(), sample_processor)
+
+        self.assertTrue(success)
+        self.assertEqual(0, held_chunks)
+        self.assertLessEqual(max_held_chunks, 3)
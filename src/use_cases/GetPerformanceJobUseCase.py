@@ -15,13 +15,14 @@ class GetPerformanceJobUseCase:
     def __init__(
         self,
         extraction_identifier: ExtractionIdentifier,
+        sample_processor: SampleProcessorUseCase,
         options: list[Option] = None,
         multi_value: bool = False,
     ):
         self.extraction_identifier = extraction_identifier
         self.multi_value = multi_value
         self.options = options
-        self.sample_processor = SampleProcessorUseCase(extraction_identifier)
+        self.sample_processor = sample_processor
 
     def get_distributed_job(self, queue_name: str, extractors: list[type[ExtractorBase]], logger: Logger) -> DistributedJob:
         samples = self.sample_processor.get_training_samples()
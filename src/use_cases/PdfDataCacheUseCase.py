@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from trainable_entity_extractor.domain.PdfData import PdfData
+from trainable_entity_extractor.domain.SegmentationData import SegmentationData
+from trainable_entity_extractor.domain.XmlFile import XmlFile
+
+from config import MODELS_DATA_PATH, PDF_DATA_CACHE_TTL, PDF_DATA_CACHE_MAX_BYTES
+from ports.SamplesCodec import SamplesCodec
+from ports.XmlHashStorage import XmlHashStorage
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class PdfDataCacheUseCase:
+    def __init__(
+        self,
+        samples_codec: SamplesCodec,
+        xml_hash_storage: XmlHashStorage,
+        run_name: str = None,
+        max_bytes: int = PDF_DATA_CACHE_MAX_BYTES,
+    ):
+        self.root_dir = Path(MODELS_DATA_PATH, "cache", "pdf_data")
+        self.cache_dir = Path(self.root_dir, run_name) if run_name else self.root_dir
+        self.cache_ttl = PDF_DATA_CACHE_TTL
+        self.max_bytes = max_bytes
+        self.samples_codec = samples_codec
+        self.xml_hash_storage = xml_hash_storage
+
+    def get_xml_hash(self, xml_file: XmlFile) -> str:
+        if xml_hash := self.xml_hash_storage.get_xml_hash(xml_file):
+            return xml_hash
+
+        xml_hash = hashlib.sha256()
+        with open(xml_file.xml_file_path, "rb") as f:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                xml_hash.update(chunk)
+        return xml_hash.hexdigest()
+
+    def get_cache_key(self, xml_file: XmlFile, segmentation_data: SegmentationData, page_numbers: list[int]) -> str:
+        key_content = [
+            self.get_xml_hash(xml_file),
+            xml_file.xml_file_name,
+            segmentation_data.model_dump(mode="json"),
+            page_numbers,
+        ]
+        return hashlib.sha256(json.dumps(key_content, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _get_cache_file_path(self, cache_key: str) -> Path:
+        return self.cache_dir / f"{cache_key}.pdf_data"
+
+    def get(self, cache_key: str) -> Optional[PdfData]:
+        file_path = self._get_cache_file_path(cache_key)
+        try:
+            pdf_data_dict = self.samples_codec.decode(file_path.read_bytes())[0]
+            os.utime(file_path, ns=(time.time_ns(), file_path.stat().st_mtime_ns))
+            return PdfData(**pdf_data_dict)
+        except Exception:
+            return None
+
+    def save(self, cache_key: str, pdf_data: PdfData) -> None:
+        file_path = self._get_cache_file_path(cache_key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            content = self.samples_codec.encode([pdf_data.model_dump(mode="json")])
+            file_descriptor, temporary_path = tempfile.mkstemp(
+                dir=self.cache_dir, prefix=f".{file_path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(file_descriptor, "wb") as f:
+                    f.write(content)
+                os.replace(temporary_path, file_path)
+            except BaseException:
+                Path(temporary_path).unlink(missing_ok=True)
+                raise
+        except Exception:
+            pass
+
+    def cleanup(self) -> None:
+        current_time = time.time()
+        cache_files_stats = list()
+        for file_path in self.root_dir.glob("*/*.pdf_data"):
+            try:
+                stat = file_path.stat()
+                if current_time - stat.st_atime > self.cache_ttl:
+                    file_path.unlink(missing_ok=True)
+                else:
+                    cache_files_stats.append((file_path, stat))
+            except FileNotFoundError:
+                continue
+
+        total_bytes = sum(stat.st_size for _, stat in cache_files_stats)
+        for file_path, stat in sorted(cache_files_stats, key=lambda x: x[1].st_atime):
+            if total_bytes <= self.max_bytes:
+                break
+            file_path.unlink(missing_ok=True)
+            total_bytes -= stat.st_size
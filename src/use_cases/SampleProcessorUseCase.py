@@ -1,6 +1,11 @@
+import multiprocessing
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from os.path import exists
-from time import sleep
+from time import sleep, monotonic
+from typing import Any, Optional
 
 import requests
 from trainable_entity_extractor.config import config_logger
@@ -14,110 +19,245 @@ from trainable_entity_extractor.domain.TrainingSample import TrainingSample
 from trainable_entity_extractor.domain.XmlFile import XmlFile
 from trainable_entity_extractor.use_cases.FilterValidSegmentsPagesUseCase import FilterValidSegmentsPagesUseCase
 
-from config import SERVICE_HOST, SERVICE_PORT
+from config import (
+    SERVICE_HOST,
+    SERVICE_PORT,
+    SAMPLES_PARSING_PROCESSES,
+    SAMPLES_PARSING_MIN_DOCUMENTS,
+    SAMPLES_REQUEST_DEADLINE,
+)
+from ports.SamplesCodec import SamplesCodec
+from ports.XmlHashStorage import XmlHashStorage
+from use_cases.PdfDataCacheUseCase import PdfDataCacheUseCase
 from use_cases.SamplesCacheUseCase import SamplesCacheUseCase
 
 
 class SampleProcessorUseCase:
-    def __init__(self, extractor_identifier: ExtractionIdentifier):
+    parsing_pool: ProcessPoolExecutor = None
+    parsing_pool_lock = threading.Lock()
+
+    def __init__(
+        self,
+        extractor_identifier: ExtractionIdentifier,
+        samples_codecs: list[SamplesCodec],
+        xml_hash_storage: XmlHashStorage,
+        parallel_parsing: bool = SAMPLES_PARSING_PROCESSES > 1,
+        cache_pdf_data: bool = True,
+    ):
         self.extraction_identifier = extractor_identifier
-        self.samples_cache_use_case = SamplesCacheUseCase()
+        self.samples_codecs = samples_codecs
+        self.xml_hash_storage = xml_hash_storage
+        self.samples_cache_use_case = SamplesCacheUseCase(samples_codecs)
+        self.parallel_parsing = parallel_parsing
+        self.pdf_data_cache = (
+            PdfDataCacheUseCase(samples_codecs[0], xml_hash_storage, extractor_identifier.run_name)
+            if cache_pdf_data
+            else None
+        )
 
-    def get_samples_for_training(self, labeled_data_list: list[LabeledData]) -> list[TrainingSample]:
-        multi_option_samples: list[TrainingSample] = list()
+    @staticmethod
+    def is_xml_file(xml_file: XmlFile) -> bool:
+        return exists(xml_file.xml_file_path) and not os.path.isdir(xml_file.xml_file_path)
+
+    @staticmethod
+    def parse_pdf_data(xml_file: XmlFile, segmentation_data: SegmentationData, page_numbers: list[int]) -> PdfData:
+        if not SampleProcessorUseCase.is_xml_file(xml_file):
+            return PdfData.from_texts([""])
+
+        return PdfData.from_xml_file(xml_file, segmentation_data, page_numbers)
+
+    @classmethod
+    def get_parsing_pool(cls) -> ProcessPoolExecutor:
+        with cls.parsing_pool_lock:
+            if not cls.parsing_pool:
+                cls.parsing_pool = ProcessPoolExecutor(
+                    max_workers=SAMPLES_PARSING_PROCESSES, mp_context=multiprocessing.get_context("spawn")
+                )
+            return cls.parsing_pool
+
+    def parse_pdf_data_list(
+        self, xml_files: list[XmlFile], segmentation_data_list: list[SegmentationData], page_numbers_list: list[list[int]]
+    ) -> list[PdfData]:
+        if not self.pdf_data_cache:
+            return self.parse_documents(xml_files, segmentation_data_list, page_numbers_list)
+
+        pdf_data_list: list[PdfData] = list()
+        cache_keys: list[str] = list()
+        for xml_file, segmentation_data, page_numbers in zip(xml_files, segmentation_data_list, page_numbers_list):
+            if not self.is_xml_file(xml_file):
+                pdf_data_list.append(PdfData.from_texts([""]))
+                cache_keys.append("")
+                continue
+
+            cache_key = self.pdf_data_cache.get_cache_key(xml_file, segmentation_data, page_numbers)
+            pdf_data_list.append(self.pdf_data_cache.get(cache_key))
+            cache_keys.append(cache_key)
+
+        missing_indexes = [index for index, pdf_data in enumerate(pdf_data_list) if pdf_data is None]
+        parsed_pdf_data_list = self.parse_documents(
+            [xml_files[index] for index in missing_indexes],
+            [segmentation_data_list[index] for index in missing_indexes],
+            [page_numbers_list[index] for index in missing_indexes],
+        )
+
+        for index, pdf_data in zip(missing_indexes, parsed_pdf_data_list):
+            pdf_data_list[index] = pdf_data
+            self.pdf_data_cache.save(cache_keys[index], pdf_data)
+
+        config_logger.info(f"Parsed {len(missing_indexes)} of {len(xml_files)} documents, the rest were cached")
+        return pdf_data_list
+
+    def parse_documents(
+        self, xml_files: list[XmlFile], segmentation_data_list: list[SegmentationData], page_numbers_list: list[list[int]]
+    ) -> list[PdfData]:
+        if not self.parallel_parsing or len(xml_files) < SAMPLES_PARSING_MIN_DOCUMENTS:
+            return list(map(self.parse_pdf_data, xml_files, segmentation_data_list, page_numbers_list))
+
+        parsing_pool = self.get_parsing_pool()
+        try:
+            return list(parsing_pool.map(self.parse_pdf_data, xml_files, segmentation_data_list, page_numbers_list))
+        except BrokenProcessPool:
+            config_logger.error("Parsing process pool is broken, parsing documents sequentially", exc_info=True)
+            with self.parsing_pool_lock:
+                if SampleProcessorUseCase.parsing_pool is parsing_pool:
+                    SampleProcessorUseCase.parsing_pool = None
+            return list(map(self.parse_pdf_data, xml_files, segmentation_data_list, page_numbers_list))
+
+    def get_training_parse_jobs(
+        self, labeled_data_list: list[LabeledData]
+    ) -> tuple[list[XmlFile], list[SegmentationData], list[list[int]]]:
         page_numbers_list = FilterValidSegmentsPagesUseCase(self.extraction_identifier).for_training(labeled_data_list)
-        for labeled_data, page_numbers_to_keep in zip(labeled_data_list, page_numbers_list):
-            segmentation_data = SegmentationData.from_labeled_data(labeled_data)
-            xml_file = XmlFile(
-                extraction_identifier=self.extraction_identifier,
-                to_train=True,
-                xml_file_name=labeled_data.xml_file_name,
-            )
+        segmentation_data_list = [SegmentationData.from_labeled_data(labeled_data) for labeled_data in labeled_data_list]
+        xml_files = [
+            XmlFile(extraction_identifier=self.extraction_identifier, to_train=True, xml_file_name=x.xml_file_name)
+            for x in labeled_data_list
+        ]
+        return xml_files, segmentation_data_list, page_numbers_list
 
-            if exists(xml_file.xml_file_path) and not os.path.isdir(xml_file.xml_file_path):
-                pdf_data = PdfData.from_xml_file(xml_file, segmentation_data, page_numbers_to_keep)
-            else:
-                pdf_data = PdfData.from_texts([""])
+    def warm_pdf_data_cache(self, labeled_data_list: list[LabeledData]) -> None:
+        if self.pdf_data_cache:
+            self.parse_pdf_data_list(*self.get_training_parse_jobs(labeled_data_list))
+
+    def get_samples_for_training(self, labeled_data_list: list[LabeledData]) -> list[TrainingSample]:
+        xml_files, segmentation_data_list, page_numbers_list = self.get_training_parse_jobs(labeled_data_list)
+        pdf_data_list = self.parse_pdf_data_list(xml_files, segmentation_data_list, page_numbers_list)
+
+        multi_option_samples: list[TrainingSample] = list()
+        for labeled_data, pdf_data, xml_file in zip(labeled_data_list, pdf_data_list, xml_files):
             sample = TrainingSample(
                 pdf_data=pdf_data, labeled_data=labeled_data, segment_selector_texts=[labeled_data.source_text]
             )
             multi_option_samples.append(sample)
             xml_file.delete()
+            self.xml_hash_storage.delete(xml_file)
 
         return multi_option_samples
 
     def get_prediction_samples(self, prediction_data_list: list[PredictionData] = None) -> list[PredictionSample]:
         filter_valid_pages = FilterValidSegmentsPagesUseCase(self.extraction_identifier)
         page_numbers_list = filter_valid_pages.for_prediction(prediction_data_list)
-        prediction_samples: list[PredictionSample] = []
-        for prediction_data, page_numbers in zip(prediction_data_list, page_numbers_list):
-            segmentation_data = SegmentationData.from_prediction_data(prediction_data)
-            entity_name = prediction_data.entity_name if prediction_data.entity_name else prediction_data.xml_file_name
-
-            xml_file = XmlFile(
-                extraction_identifier=self.extraction_identifier,
-                to_train=False,
-                xml_file_name=prediction_data.xml_file_name,
-            )
+        segmentation_data_list = [SegmentationData.from_prediction_data(x) for x in prediction_data_list]
+        xml_files = [
+            XmlFile(extraction_identifier=self.extraction_identifier, to_train=False, xml_file_name=x.xml_file_name)
+            for x in prediction_data_list
+        ]
 
-            if exists(xml_file.xml_file_path) and not os.path.isdir(xml_file.xml_file_path):
-                pdf_data = PdfData.from_xml_file(xml_file, segmentation_data, page_numbers)
-            else:
-                pdf_data = PdfData.from_texts([""])
+        pdf_data_list = self.parse_documents(xml_files, segmentation_data_list, page_numbers_list)
 
+        prediction_samples: list[PredictionSample] = []
+        for prediction_data, pdf_data, xml_file in zip(prediction_data_list, pdf_data_list, xml_files):
+            entity_name = prediction_data.entity_name if prediction_data.entity_name else prediction_data.xml_file_name
             xml_file.delete()
+            self.xml_hash_storage.delete(xml_file)
 
             sample = PredictionSample(pdf_data=pdf_data, entity_name=entity_name, source_text=prediction_data.source_text)
             prediction_samples.append(sample)
 
         return prediction_samples
 
-    def import_samples(self, for_training: bool) -> list[TrainingSample | PredictionSample]:
-        samples: list[TrainingSample | PredictionSample] = list()
+    def import_samples(self, for_training: bool, limit: int = None) -> list[TrainingSample | PredictionSample]:
         max_retries = 3
         retry_delay = 5
         retries = 0
+        deadline = monotonic() + SAMPLES_REQUEST_DEADLINE
 
         url = f"{SERVICE_HOST}:{SERVICE_PORT}"
         url += "/get_samples_training" if for_training else "/get_samples_prediction"
         url += f"/{self.extraction_identifier.run_name}/{self.extraction_identifier.extraction_name}"
+        params = {"limit": limit} if limit else None
 
-        while retries <= max_retries:
+        while True:
             try:
-                response = requests.get(url)
-                response.raise_for_status()
-
-                if not response.json():
-                    break
+                response = requests.get(url, params=params, headers=self.get_samples_request_headers(), stream=True)
+                if response.status_code == 503:
+                    response.close()
+                    self.wait_until_not_busy(response, deadline)
+                    continue
 
-                samples.extend([TrainingSample(**x) if for_training else PredictionSample(**x) for x in response.json()])
-                break
+                response.raise_for_status()
+                samples_dicts = self.decode_samples_response(response) or list()
+                return [TrainingSample(**x) if for_training else PredictionSample(**x) for x in samples_dicts]
             except requests.exceptions.RequestException as e:
                 config_logger.error(f"Error fetching training samples: {e}")
                 retries += 1
-                if retries <= max_retries:
-                    config_logger.info(f"Retrying in {retry_delay} seconds... (attempt {retries}/{max_retries})")
-                    sleep(retry_delay)
-                else:
+                if retries > max_retries:
                     config_logger.error("Max retries reached. Exiting.")
-                    break
+                    raise
 
-        return samples
+                config_logger.info(f"Retrying in {retry_delay} seconds... (attempt {retries}/{max_retries})")
+                sleep(retry_delay)
+
+    @staticmethod
+    def wait_until_not_busy(response: requests.Response, deadline: float):
+        remaining_time = deadline - monotonic()
+        if remaining_time <= 0:
+            raise TimeoutError(f"Samples service still busy after {SAMPLES_REQUEST_DEADLINE} seconds")
+
+        try:
+            retry_after = float(response.headers.get("Retry-After", "5"))
+        except ValueError:
+            retry_after = 5
+
+        config_logger.info(f"Samples service is busy, retrying in {retry_after} seconds")
+        sleep(min(max(retry_after, 0), remaining_time))
+
+    def get_samples_request_headers(self) -> dict[str, str]:
+        media_types = list(dict.fromkeys(samples_codec.media_type for samples_codec in self.samples_codecs))
+        content_encodings = list(dict.fromkeys(samples_codec.content_encoding for samples_codec in self.samples_codecs))
+        return {"Accept": ", ".join(media_types), "Accept-Encoding": ", ".join(content_encodings)}
+
+    def get_response_samples_codec(self, response: requests.Response) -> Optional[SamplesCodec]:
+        media_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        content_encoding = response.headers.get("Content-Encoding", "").strip().lower()
+        for samples_codec in self.samples_codecs:
+            if samples_codec.media_type == media_type and samples_codec.content_encoding == content_encoding:
+                return samples_codec
+
+        return None
+
+    def decode_samples_response(self, response: requests.Response) -> list[dict[str, Any]]:
+        samples_codec = self.get_response_samples_codec(response)
+        if not samples_codec:
+            return response.json()
+
+        return samples_codec.decode(response.raw.read(decode_content=False))
 
     def get_training_samples(self) -> list[TrainingSample]:
         key = SamplesCacheUseCase.get_training_cache_key(
             run_name=self.extraction_identifier.run_name, extraction_name=self.extraction_identifier.extraction_name
         )
-        cached_samples = self.samples_cache_use_case.get_cached_samples(key)
+        cached_samples = self.samples_cache_use_case.get_materialized_samples(
+            key, lambda samples_dicts: [TrainingSample(**sample) for sample in samples_dicts]
+        )
         if cached_samples:
-            return [TrainingSample(**sample) for sample in cached_samples]
+            return cached_samples
 
         samples = self.import_samples(for_training=True)
         self.samples_cache_use_case.cache_samples(key, samples)
         return samples
 
-    def get_prediction_samples_for_suggestions(self) -> list[PredictionSample]:
-        return self.import_samples(for_training=False)
+    def get_prediction_samples_page(self, limit: int) -> list[PredictionSample]:
+        return self.import_samples(for_training=False, limit=limit)
 
     def is_extractor_cancelled(self) -> bool:
         try:
@@ -1,52 +1,166 @@
-import json
 import gzip
+import json
+import os
 import shutil
+import tempfile
+import threading
 import time
+from collections import Counter, OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Callable, Any
 
 from pydantic import BaseModel
 
-from config import MODELS_DATA_PATH, LAST_RUN_PATH
+from config import MODELS_DATA_PATH, LAST_RUN_PATH, SAMPLES_CACHE_MAX_BYTES, SAMPLES_MEMORY_CACHE_SIZE
+from ports.SamplesCodec import SamplesCodec
+
+CACHE_FORMAT_VERSION = 2
+CACHE_HEADER_PREFIX = b"samples-cache:"
+CACHE_HEADER_MAX_SIZE = 128
+LEGACY_SAMPLES_CODEC_NAME = "gzip-json"
 
 
 class SamplesCacheUseCase:
-    def __init__(self):
+    statistics: Counter = Counter()
+    materialized_samples: OrderedDict[str, tuple[tuple[int, int], list[Any]]] = OrderedDict()
+    materialized_samples_lock = threading.Lock()
+
+    def __init__(self, samples_codecs: list[SamplesCodec], max_bytes: int = SAMPLES_CACHE_MAX_BYTES):
         self.cache_dir = Path(MODELS_DATA_PATH, "cache")
         self.cache_dir.mkdir(exist_ok=True, parents=True)
         self.cache_ttl = 86400
+        self.max_bytes = max_bytes
+        self.samples_codecs = samples_codecs
+        self.samples_codec = samples_codecs[0]
+        self.legacy_samples_codec = self.get_samples_codec_by_name(LEGACY_SAMPLES_CODEC_NAME)
+
+    def get_samples_codec_by_name(self, name: str) -> Optional[SamplesCodec]:
+        for samples_codec in self.samples_codecs:
+            if samples_codec.name == name:
+                return samples_codec
+
+        return None
 
     def _get_cache_file_path(self, cache_key: str) -> Path:
+        return self.cache_dir / f"{cache_key}.cache"
+
+    def _get_legacy_cache_file_path(self, cache_key: str) -> Path:
         return self.cache_dir / f"{cache_key}.cache.gz"
 
+    def _get_existing_cache_file_path(self, cache_key: str) -> Optional[Path]:
+        for file_path in [self._get_cache_file_path(cache_key), self._get_legacy_cache_file_path(cache_key)]:
+            if file_path.exists():
+                return file_path
+        return None
+
     def _is_cache_valid(self, file_path: Path) -> bool:
         if not file_path.exists():
             return False
         file_age = time.time() - file_path.stat().st_mtime
         return file_age < self.cache_ttl
 
-    def _compress_and_save(self, data: list[BaseModel], file_path: Path) -> None:
-        serialized_data = [item.model_dump() for item in data]
-        json_str = json.dumps(serialized_data)
-        json_bytes = json_str.encode("utf-8")
-        with gzip.open(file_path, "wb") as f:
-            f.write(json_bytes)
+    @staticmethod
+    def _to_dicts(data: list[BaseModel] | list[dict]) -> list[dict]:
+        return [item.model_dump(mode="json") if isinstance(item, BaseModel) else item for item in data]
 
-    def _load_and_decompress(self, file_path: Path) -> list[dict]:
-        with gzip.open(file_path, "rb") as f:
-            json_bytes = f.read()
-        json_str = json_bytes.decode("utf-8")
-        return json.loads(json_str)
+    def _compress_and_save(self, data: list[BaseModel] | list[dict], file_path: Path) -> None:
+        header = f"{CACHE_HEADER_PREFIX.decode()}{CACHE_FORMAT_VERSION}:{self.samples_codec.name}\n".encode()
+        content = self.samples_codec.encode(self._to_dicts(data))
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{file_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "wb") as f:
+                f.write(header)
+                f.write(content)
+            os.replace(temporary_path, file_path)
+        except BaseException:
+            Path(temporary_path).unlink(missing_ok=True)
+            raise
 
-    def get_cached_samples(self, cache_key: str) -> Optional[list[dict]]:
+    def _read_header(self, file_path: Path) -> tuple[SamplesCodec, int]:
+        with open(file_path, "rb") as f:
+            first_line = f.readline(CACHE_HEADER_MAX_SIZE)
+
+        if not first_line.startswith(CACHE_HEADER_PREFIX):
+            samples_codec, payload_offset = self.legacy_samples_codec, 0
+        else:
+            version, _, codec_name = first_line[len(CACHE_HEADER_PREFIX) :].decode().strip().partition(":")
+            samples_codec = self.get_samples_codec_by_name(codec_name) if int(version) <= CACHE_FORMAT_VERSION else None
+            payload_offset = len(first_line)
+
+        if not samples_codec:
+            raise ValueError(f"Unsupported samples cache format {first_line!r} in {file_path}")
+
+        return samples_codec, payload_offset
+
+    @staticmethod
+    def _register_access(file_path: Path) -> None:
+        os.utime(file_path, ns=(time.time_ns(), file_path.stat().st_mtime_ns))
+
+    def get_valid_cache_file(self, cache_key: str) -> Optional[tuple[Path, SamplesCodec, int]]:
         try:
-            file_path = self._get_cache_file_path(cache_key)
-            if self._is_cache_valid(file_path):
-                return self._load_and_decompress(file_path)
+            file_path = self._get_existing_cache_file_path(cache_key)
+            if not file_path or not self._is_cache_valid(file_path):
+                self.statistics["misses"] += 1
+                return None
+            samples_codec, payload_offset = self._read_header(file_path)
+            self._register_access(file_path)
+            self.statistics["hits"] += 1
+            return file_path, samples_codec, payload_offset
+        except Exception:
+            self.statistics["misses"] += 1
             return None
+
+    @staticmethod
+    def read_cache_file(cache_file: tuple[Path, SamplesCodec, int]) -> Optional[list[dict]]:
+        try:
+            file_path, samples_codec, payload_offset = cache_file
+            with open(file_path, "rb") as f:
+                f.seek(payload_offset)
+                return samples_codec.decode(f.read())
         except Exception:
             return None
 
+    def get_cached_samples(self, cache_key: str) -> Optional[list[dict]]:
+        cache_file = self.get_valid_cache_file(cache_key)
+        return self.read_cache_file(cache_file) if cache_file else None
+
+    def get_materialized_samples(
+        self, cache_key: str, materialize: Callable[[list[dict]], list[Any]]
+    ) -> Optional[list[Any]]:
+        # Each caller gets its own list, but the samples are shared across callers and must be treated as read-only
+        cache_file = self.get_valid_cache_file(cache_key)
+        if not cache_file:
+            return None
+
+        try:
+            file_stat = cache_file[0].stat()
+        except FileNotFoundError:
+            return None
+
+        file_version = (file_stat.st_mtime_ns, file_stat.st_size)
+        with self.materialized_samples_lock:
+            materialized_version, samples = self.materialized_samples.get(cache_key, (None, None))
+            if materialized_version == file_version:
+                self.materialized_samples.move_to_end(cache_key)
+                self.statistics["memory_hits"] += 1
+                return list(samples)
+
+        cached_samples = self.read_cache_file(cache_file)
+        if cached_samples is None:
+            return None
+
+        samples = materialize(cached_samples)
+        with self.materialized_samples_lock:
+            self.materialized_samples[cache_key] = (file_version, samples)
+            self.materialized_samples.move_to_end(cache_key)
+            while len(self.materialized_samples) > SAMPLES_MEMORY_CACHE_SIZE:
+                self.materialized_samples.popitem(last=False)
+        return list(samples)
+
+    def forget_materialized_samples(self, cache_key: str) -> None:
+        with self.materialized_samples_lock:
+            self.materialized_samples.pop(cache_key, None)
+
     def cache_samples(self, cache_key: str, data: list[BaseModel]) -> None:
         try:
             file_path = self._get_cache_file_path(cache_key)
@@ -70,27 +184,70 @@ class SamplesCacheUseCase:
             metadata = {"timestamp": time.time(), "sample_count": len(data)}
             metadata_file.write_text(json.dumps(metadata, indent=2))
 
+            # The debug tools read this file as gzip JSON whatever codecs are configured
             data_file = last_run_dir / "training_data.json.gz"
-            self._compress_and_save(data, data_file)
+            data_file.write_bytes(gzip.compress(json.dumps(self._to_dicts(data)).encode("utf-8")))
         except Exception:
             pass
 
+    def _get_cache_files(self) -> list[Path]:
+        return [*self.cache_dir.glob("*.cache"), *self.cache_dir.glob("*.cache.gz")]
+
     def cleanup_expired_cache(self) -> None:
         try:
             current_time = time.time()
-            for cache_file in self.cache_dir.glob("*.cache.gz"):
+            for cache_file in self._get_cache_files():
                 if current_time - cache_file.stat().st_mtime > self.cache_ttl:
                     cache_file.unlink(missing_ok=True)
+                    self.statistics["expirations"] += 1
+        except Exception:
+            pass
+
+    def evict_least_recently_used(self) -> None:
+        try:
+            cache_files_stats = list()
+            for cache_file in self._get_cache_files():
+                try:
+                    cache_files_stats.append((cache_file, cache_file.stat()))
+                except FileNotFoundError:
+                    continue
+
+            total_bytes = sum(stat.st_size for _, stat in cache_files_stats)
+            for cache_file, stat in sorted(cache_files_stats, key=lambda x: x[1].st_atime):
+                if total_bytes <= self.max_bytes:
+                    break
+                cache_file.unlink(missing_ok=True)
+                total_bytes -= stat.st_size
+                self.statistics["evictions"] += 1
         except Exception:
             pass
 
+    def cleanup(self) -> None:
+        self.cleanup_expired_cache()
+        self.evict_least_recently_used()
+
+    def get_statistics(self) -> dict[str, int]:
+        cache_files = self._get_cache_files()
+        return {
+            "hits": self.statistics["hits"],
+            "misses": self.statistics["misses"],
+            "memory_hits": self.statistics["memory_hits"],
+            "evictions": self.statistics["evictions"],
+            "expirations": self.statistics["expirations"],
+            "files": len(cache_files),
+            "bytes": sum(x.stat().st_size for x in cache_files if x.exists()),
+            "max_bytes": self.max_bytes,
+        }
+
     def delete_cache(self, cache_key: str) -> bool:
+        self.forget_materialized_samples(cache_key)
         try:
-            file_path = self._get_cache_file_path(cache_key)
-            if file_path.exists():
-                file_path.unlink()
-                return True
-            return False
+            deleted = False
+            for file_path in [self._get_cache_file_path(cache_key), self._get_legacy_cache_file_path(cache_key)]:
+                if file_path.exists():
+                    file_path.unlink()
+                    deleted = True
+            return deleted
         except Exception:
             return False
 
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from trainable_entity_extractor.config import config_logger
+from trainable_entity_extractor.domain.XmlFile import XmlFile
+
+from ports.XmlBlobStorage import XmlBlobStorage
+from ports.XmlHashStorage import XmlHashStorage
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class XmlUploadUseCase:
+    def __init__(
+        self,
+        xml_file: XmlFile,
+        xml_hash_storage: Optional[XmlHashStorage] = None,
+        xml_blob_storage: Optional[XmlBlobStorage] = None,
+    ):
+        self.xml_file = xml_file
+        self.xml_file_path = Path(xml_file.xml_file_path)
+        self.xml_hash_storage = xml_hash_storage
+        self.xml_blob_storage = xml_blob_storage
+
+    def save(self, stream: BinaryIO) -> str:
+        self.xml_file_path.parent.mkdir(parents=True, exist_ok=True)
+        content_hash = hashlib.sha256()
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.xml_file_path.parent, prefix=f".{self.xml_file_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as temporary_file:
+                while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+                    content_hash.update(chunk)
+                    temporary_file.write(chunk)
+            if self.xml_blob_storage:
+                self.xml_blob_storage.save(temporary_path, self.xml_file_path, content_hash.hexdigest())
+            else:
+                os.replace(temporary_path, self.xml_file_path)
+        except BaseException:
+            Path(temporary_path).unlink(missing_ok=True)
+            raise
+
+        self.save_xml_hash(content_hash.hexdigest())
+
+        return content_hash.hexdigest()
+
+    def attach(self, xml_hash: str) -> bool:
+        if not self.xml_blob_storage or not self.xml_blob_storage.attach(xml_hash, self.xml_file_path):
+            return False
+
+        self.save_xml_hash(xml_hash)
+
+        return True
+
+    def save_xml_hash(self, xml_hash: str):
+        if not self.xml_hash_storage:
+            return
+
+        try:
+            self.xml_hash_storage.save_xml_hash(self.xml_file, xml_hash)
+        except Exception:
+            self.xml_hash_storage.delete(self.xml_file)
+            config_logger.warning(f"Could not save the hash of {self.xml_file_path}", exc_info=True)